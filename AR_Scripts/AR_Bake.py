@@ -0,0 +1,1021 @@
+"""
+AR_Bake
+
+Author: Arttu Rautio (aturtur)
+Website: http://aturtur.com/
+Name-US: AR_Bake
+Version: 1.0
+Description-US: Shared baking pipeline that AR_BakeObjectPSR, AR_BakeCameras and AR_BakeObjectPLA import. Running it prints the current settings.
+
+Written for Maxon Cinema 4D R21.207
+Python version 2.7.14
+"""
+# Libraries
+import c4d
+import os
+import sys
+import array
+import collections
+import math
+import time
+import json
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
+try:
+    import numpy # Global matrices are decomposed in one vectorized pass when NumPy is available
+except ImportError:
+    numpy = None
+
+# Settings, every baking script sets these from its own config with Setup()
+keyTolerance = 0.01 # Maximum error allowed when reducing baked keyframes (degrees for angles)
+headless = True # If set true, interface is not updated while baking
+progressStep = 10 # Status bar is updated and Esc key is checked every n frames
+profile = False # If set true, time spent in every phase and frame is recorded
+incremental = False # If set true, earlier bakes are updated and only frames that can have changed are evaluated again
+subFrameAngle = 0.0 # Sub-frame samples are added between frames where an angle changes more than this (degrees), 0 disables
+subFrameDistance = 0.0 # Sub-frame samples are added between frames where position moves more than this (centimeters), 0 disables
+subFrameDepth = 2 # How many times a fast frame can be split in half
+workers = 1 # Amount of worker threads that sample parts of the preview range in copies of the document, 1 samples serially, 0 uses every CPU core
+settingNames = ["keyTolerance", "headless", "progressStep", "profile", "incremental", "subFrameAngle", "subFrameDistance", "subFrameDepth", "workers"] # Settings that Setup() accepts
+
+# Global variables
+psrVault = [ [903, c4d.DTYPE_REAL, 1000, c4d.DTYPE_VECTOR], [903, c4d.DTYPE_REAL, 1001, c4d.DTYPE_VECTOR], [903, c4d.DTYPE_REAL, 1002, c4d.DTYPE_VECTOR], # Position
+             [904, c4d.DTYPE_REAL, 1000, c4d.DTYPE_VECTOR], [904, c4d.DTYPE_REAL, 1001, c4d.DTYPE_VECTOR], [904, c4d.DTYPE_REAL, 1002, c4d.DTYPE_VECTOR], # Rotation
+             [905, c4d.DTYPE_REAL, 1000, c4d.DTYPE_VECTOR], [905, c4d.DTYPE_REAL, 1001, c4d.DTYPE_VECTOR], [905, c4d.DTYPE_REAL, 1002, c4d.DTYPE_VECTOR],  # Scale
+           ] # PSR channels, baked channels of every source start with these
+angleChannels = [904, 1008, 4600, 1302, 1170, 1171, 1172, 1173, 1180] # Channels that are angles (radians): rotation and camera angles
+matrixComponents = 12 # Sampled values of the global matrix: offset, v1, v2 and v3 vectors, decomposed to the nine PSR channels
+simulationTypes = [180000102, # Dynamics Body tag
+                   100004020, # Cloth tag
+                   1018068, # Spline Dynamics tag
+                   1017305, # Hair object
+                   5109, # Emitter object
+                   1019234, # Delay effector
+                   1018655, # Tracer object
+                   1001414, # Thinking Particles Particle Geometry object
+                   1023866, # Python Generator object
+                   1025800, # Python effector
+                   c4d.Tpython, # Python tag
+                   c4d.Texpresso, # Xpresso tag, also Thinking Particles setups
+                  ] # Objects and tags that depend on previous frames or can keep state between frames
+unpredictableTypes = [c4d.Tpython, c4d.Texpresso] # Tags that can change the object without keyframes
+bakeTagName = "AR_Bake data" # Name of the hidden tag that stores bake data to the baked object
+cacheTagName = "Point Cache" # Name of the Python tag that reads point cache files of AR_BakeObjectPLA
+validationFrames = 5 # Amount of unchanged frames that are sampled again to verify an incremental re-bake
+timer = getattr(time, "perf_counter", time.time) # High resolution timer when available
+timings = {} # Profiled phases: [total time, amount of calls]
+frameTimes = [] # Profiled frames: [frame, evaluation time, sampling time]
+
+# Functions
+def Setup(**settings):
+    """ Sets settings from the config of the running script and clears profiling data of the previous run, the module stays loaded between runs """
+    for name, value in settings.items(): # Iterate through given settings
+        if name not in settingNames: # If setting does not exist
+            raise TypeError("Unknown bake setting: %s" % name)
+        globals()[name] = value
+    timings.clear()
+    del frameTimes[:]
+
+def SetCurrentFrame(frame, doc):
+    """ Changes editor's current frame to  """
+
+    start = timer() # Start profiling
+    doc.SetTime(c4d.BaseTime(float(frame)/doc.GetFps())) # Set current time to given frame
+    doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
+    if not headless: # Interface is synced only when not baking headless
+        c4d.GeSyncMessage(c4d.EVMSG_TIMECHANGED) # Send a synchronous event message that time has changed
+    Record("Scene evaluation", start)
+    if profile:
+        frameTimes.append([frame, timer()-start, 0.0])
+    return
+
+def EscapePressed():
+    """ Checks if Escape key is pressed """
+    bc = c4d.BaseContainer() # Initialize a base container
+    if c4d.gui.GetInputState(c4d.BFM_INPUT_KEYBOARD, c4d.KEY_ESC, bc):
+        return bc[c4d.BFM_INPUT_VALUE] == 1
+    return False
+
+def Progress(frame, startFrame, endFrame, step=None):
+    """ Updates status bar every few frames, returns False if baking is cancelled. Frame can be a sub-frame time,
+    step is the running number of the sample when sampled frames are not consecutive """
+    if step is None: # If every frame is sampled
+        step = frame-startFrame
+    if step % max(progressStep, 1) != 0: # Status bar and keyboard are not checked on every frame
+        return True
+    c4d.StatusSetText("Baking frame %g / %d (Esc to cancel)" % (frame, endFrame))
+    c4d.StatusSetBar(int(100.0*(frame-startFrame)/max(endFrame-startFrame, 1))) # Progress percentage
+    return not EscapePressed()
+
+def Record(phase, start):
+    """ Adds time elapsed from start to the profiled phase """
+    if not profile: # If profiling is disabled
+        return
+    phaseTime = timings.setdefault(phase, [0.0, 0]) # Total time and amount of calls
+    phaseTime[0] += timer() - start
+    phaseTime[1] += 1
+
+def RecordFrame(start):
+    """ Sets time elapsed from start as sampling time of the last evaluated frame """
+    if profile and frameTimes: # If profiling is enabled and a frame was evaluated
+        frameTimes[-1][2] = timer()-start
+
+def Report(name, doc):
+    """ Prints profiling summary and writes report as JSON file next to the document """
+    if not profile: # If profiling is disabled
+        return
+    print("%s profile:" % name)
+    for phase, (seconds, calls) in sorted(timings.items(), key=lambda item: -item[1][0]): # Slowest phase first
+        print("    %-20s %10.3f s %8d calls" % (phase, seconds, calls))
+    for frame, evaluation, sampling in sorted(frameTimes, key=lambda item: -(item[1]+item[2]))[:5]: # Slowest frames
+        print("    Frame %-14g %10.3f s" % (frame, evaluation+sampling))
+    if doc.GetDocumentPath() == "": # If report can't be written next to the document
+        print("Save the document to write the profile report")
+        return
+    report = {"script": name,
+              "document": doc.GetDocumentName(),
+              "phases": dict((phase, {"seconds": seconds, "calls": calls}) for phase, (seconds, calls) in timings.items()),
+              "frames": [{"frame": frame, "evaluation": evaluation, "sampling": sampling} for frame, evaluation, sampling in frameTimes]}
+    path = os.path.join(doc.GetDocumentPath(), os.path.splitext(doc.GetDocumentName())[0]+"_"+name+"_profile.json") # Report file path
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=4)
+    print("Profile report written to %s" % path)
+
+def GetDescID(data):
+    """ Returns DescID of the data vault item """
+    if len(data) == 2: # Float
+        return c4d.DescID(c4d.DescLevel(data[0], data[1],0))
+    if len(data) == 4: # Vector
+        return c4d.DescID(c4d.DescLevel(data[0], data[3],0), c4d.DescLevel(data[2], data[1],0))
+
+def GetValue(obj, data):
+    """ Returns value of the data vault item from the object """
+    if len(data) == 2: # Float
+        return obj[data[0]]
+    if len(data) == 4: # Vector
+        return obj[data[0],data[2]]
+
+def SetValue(obj, data, value):
+    """ Sets value of the data vault item to the object """
+    if data[1] == c4d.DTYPE_BOOL: # If boolean
+        value = bool(value)
+    elif data[1] == c4d.DTYPE_LONG: # If integer
+        value = int(value)
+    if len(data) == 2: # Float
+        obj[data[0]] = value
+    if len(data) == 4: # Vector
+        obj[data[0],data[2]] = value
+
+def GetFrameRange(doc):
+    """ Returns the first and the last frame of the preview range """
+    fps = doc.GetFps() # Get Frame Rate
+    return doc.GetLoopMinTime().GetFrame(fps), doc.GetLoopMaxTime().GetFrame(fps)
+
+def GetSimulation(doc):
+    """ Returns the first simulation or other frame dependent object or tag of the document, None if frames can be evaluated in any order """
+    for obj, depth in AR_SceneIndex.Walk(doc.GetFirstObject()): # Iterate through every object
+        if obj.GetType() in simulationTypes: # If simulated object
+            return obj
+        for t in obj.GetTags(): # Iterate through tags
+            if t.GetType() in simulationTypes and not IsBakeTag(t) and not IsCacheTag(t): # If simulation tag, bake data and cache reader tags only read the frame
+                return t
+    return None
+
+def DescribeSimulation(simulation):
+    """ Returns name of the simulation object, or name of the simulation tag and its object """
+    if isinstance(simulation, c4d.BaseTag): # If simulation is a tag
+        return "%s on %s" % (simulation.GetName(), simulation.GetObject().GetName())
+    return simulation.GetName()
+
+def NewSamples(channels, world):
+    """ Returns empty value arrays, one per source and channel. In world space PSR channels are sampled as global matrix components """
+    extra = matrixComponents - len(psrVault) if world else 0 # Matrix has more components than PSR channels
+    return [[array.array('d') for i in range(len(items) + extra)] for items in channels]
+
+def DecomposeNumPy(matrices):
+    """ Decomposes sampled global matrices to position, HPB rotation and scale arrays with NumPy """
+    m = numpy.array(matrices, dtype=float) # Matrix components, one row per component
+    off, v1, v2, v3 = m[0:3], m[3:6], m[6:9], m[9:12]
+    scale = numpy.sqrt(numpy.array([(v1*v1).sum(0), (v2*v2).sum(0), (v3*v3).sum(0)])) # Scale is length of the axis
+    scale[2] = numpy.where((numpy.cross(v1, v2, axis=0)*v3).sum(0) < 0, -scale[2], scale[2]) # Mirrored matrices get negative z scale
+    length = numpy.where(scale == 0, 1.0, scale) # Zero length axes are not normalized
+    n1, n2, n3 = v1/length[0], v2/length[1], v3/length[2] # Rotation matrix, z axis is flipped if mirrored
+    l = numpy.sqrt(n3[0]*n3[0] + n3[2]*n3[2]) # Length of z axis on the floor plane
+    gimbal = l < 0.00001 # Z axis points straight up or down
+    h = numpy.where(gimbal, 0.0, numpy.arctan2(-n3[0], n3[2]))
+    p = numpy.arctan2(n3[1], l)
+    b = numpy.where(gimbal, numpy.arctan2(numpy.where(n3[1] > 0, n1[2], -n1[2]), n1[0]), numpy.arctan2(-n1[1], n2[1]))
+    return [array.array('d', values.tolist()) for values in [off[0], off[1], off[2], h, p, b, scale[0], scale[1], scale[2]]]
+
+def DecomposePython(matrices, order):
+    """ Decomposes sampled global matrices to position, rotation and scale arrays """
+    channels = [array.array('d') for data in psrVault] # Initialize value arrays for position, rotation and scale
+    for frame in zip(*matrices): # Iterate through sampled frames
+        ox, oy, oz, x1, y1, z1, x2, y2, z2, x3, y3, z3 = frame
+        sx = math.sqrt(x1*x1 + y1*y1 + z1*z1) # Scale is length of the axis
+        sy = math.sqrt(x2*x2 + y2*y2 + z2*z2)
+        sz = math.sqrt(x3*x3 + y3*y3 + z3*z3)
+        if ((y1*z2 - z1*y2)*x3 + (z1*x2 - x1*z2)*y3 + (x1*y2 - y1*x2)*z3) < 0: # If matrix is mirrored
+            sz = -sz
+        x1, y1, z1 = [v/sx if sx else v for v in (x1, y1, z1)] # Rotation matrix, z axis is flipped if mirrored
+        x2, y2, z2 = [v/sy if sy else v for v in (x2, y2, z2)]
+        x3, y3, z3 = [v/sz if sz else v for v in (x3, y3, z3)]
+        if order == c4d.ROTATIONORDER_HPB: # Default rotation order
+            l = math.sqrt(x3*x3 + z3*z3) # Length of z axis on the floor plane
+            if l < 0.00001: # If z axis points straight up or down
+                rotation = (0.0, math.atan2(y3, l), math.atan2(z1 if y3 > 0 else -z1, x1))
+            else:
+                rotation = (math.atan2(-x3, z3), math.atan2(y3, l), math.atan2(-y1, y2))
+        else: # Other rotation orders are converted by Cinema 4D
+            m = c4d.Matrix(c4d.Vector(0), c4d.Vector(x1, y1, z1), c4d.Vector(x2, y2, z2), c4d.Vector(x3, y3, z3))
+            hpb = c4d.utils.MatrixToHPB(m, order)
+            rotation = (hpb.x, hpb.y, hpb.z)
+        for values, value in zip(channels, (ox, oy, oz) + rotation + (sx, sy, sz)):
+            values.append(value)
+    return channels
+
+def ClosestRotation(previous, rotation, order):
+    """ Returns the equivalent rotation that is closest to the previous one """
+    if order != c4d.ROTATIONORDER_HPB: # Other rotation orders are handled by Cinema 4D
+        closest = c4d.utils.GetOptimalAngle(c4d.Vector(*previous), c4d.Vector(*rotation), order)
+        return (closest.x, closest.y, closest.z)
+    h, p, b = rotation
+    best = None # Closest candidate
+    for candidate in [(h, p, b), (h+math.pi, math.pi-p, b+math.pi)]: # Both HPB solutions of the same matrix
+        candidate = [a + 2*math.pi*round((q-a)/(2*math.pi)) for q, a in zip(previous, candidate)] # Nearest full turn
+        distance = sum(abs(q-a) for q, a in zip(previous, candidate))
+        if best is None or distance < best[0]:
+            best = (distance, candidate)
+    return tuple(best[1])
+
+def Unwrap(rotations, order):
+    """ Removes flips from rotation arrays by keeping every sample continuous with the previous one """
+    h, p, b = rotations
+    for i in range(1, len(h)): # Iterate through samples
+        h[i], p[i], b[i] = ClosestRotation((h[i-1], p[i-1], b[i-1]), (h[i], p[i], b[i]), order)
+
+def Decompose(samples, order):
+    """ Decomposes sampled global matrix components to position, rotation and scale arrays, values of other channels are kept """
+    start = timer() # Start profiling
+    matrices = samples[:matrixComponents] # Global matrix components
+    if numpy is not None and order == c4d.ROTATIONORDER_HPB: # If vectorized pass is possible
+        channels = DecomposeNumPy(matrices)
+    else:
+        channels = DecomposePython(matrices, order)
+    Record("Decomposition", start)
+    return channels + samples[matrixComponents:]
+
+def SampleFrame(sources, channels, samples, world):
+    """ Appends values of given channels from the evaluated frame to sample arrays. In world space PSR is decomposed from the global matrix after sampling """
+    for source, items, arrays in zip(sources, channels, samples): # Sample every source from the same evaluated frame
+        if world: # If global matrix is baked
+            mg = source.GetMg() # Get global matrix
+            for values, value in zip(arrays, (mg.off.x, mg.off.y, mg.off.z, mg.v1.x, mg.v1.y, mg.v1.z,
+                                              mg.v2.x, mg.v2.y, mg.v2.z, mg.v3.x, mg.v3.y, mg.v3.z)):
+                values.append(value)
+            for data, values in zip(items[len(psrVault):], arrays[matrixComponents:]): # Iterate through other channels
+                values.append(GetValue(source, data))
+        else:
+            for data, values in zip(items, arrays): # Iterate through channels
+                values.append(GetValue(source, data))
+
+def Sample(sources, channels, world, doc):
+    """ Steps through the preview range once and collects values of given channels to flat arrays """
+    startFrame, endFrame = GetFrameRange(doc)
+    count = GetWorkerCount(doc, endFrame-startFrame+1) # Amount of worker threads
+    if count > 1: # If frames can be evaluated in parallel
+        return SampleParallel(sources, channels, world, doc, startFrame, endFrame, count)
+    return SampleFrames(sources, channels, world, doc, range(startFrame, endFrame+1))
+
+def GetWorkerCount(doc, frameCount):
+    """ Returns amount of worker threads for the bake, 1 means serial baking """
+    if workers == 1: # If parallel sampling is disabled
+        return 1
+    count = workers if workers > 0 else c4d.threading.GeGetCPUCount() # Amount of threads
+    count = min(count, frameCount // 10) # Every thread gets at least ten frames
+    if count > 1: # If frames would be evaluated out of order
+        simulation = GetSimulation(doc)
+        if simulation is not None: # If frames have to be evaluated in order
+            print("Baking serially, %s depends on previous frames" % DescribeSimulation(simulation))
+            return 1
+    return max(count, 1)
+
+class SampleThread(c4d.threading.C4DThread):
+    """ Samples a part of the preview range from a copy of the document """
+    def __init__(self, doc, sources, channels, world, startFrame, endFrame):
+        super(SampleThread, self).__init__()
+        self.doc = doc # Copy of the document
+        self.sources = sources # Sources in the copy
+        self.channels = channels # Channels of every source
+        self.world = world # Is global matrix baked
+        self.startFrame = startFrame # First frame of the chunk
+        self.endFrame = endFrame # Last frame of the chunk
+        self.frames = array.array('l') # Initialize an array for sampled frames
+        self.samples = NewSamples(channels, world) # Initialize value arrays, one per source and channel
+
+    def Main(self):
+        """ Evaluates the frames of the chunk in order """
+        fps = self.doc.GetFps() # Get Frame Rate
+        for i in range(self.startFrame, self.endFrame+1): # Iterate through the chunk
+            if self.TestBreak(): # If baking is cancelled
+                return
+            self.doc.SetTime(c4d.BaseTime(float(i)/fps)) # Set current time to given frame
+            self.doc.ExecutePasses(self.Get(), True, True, True, 0) # Animate the current frame of the copy
+            SampleFrame(self.sources, self.channels, self.samples, self.world)
+            self.frames.append(self.doc.GetTime().GetFrame(fps)) # Frame is stored after its samples, so the count is always complete
+
+def SampleParallel(sources, channels, world, doc, startFrame, endFrame, count):
+    """ Splits the preview range to chunks, samples them in copies of the document and merges samples in frame order.
+    Returns None if baking is cancelled """
+    start = timer() # Start profiling
+    hierarchy = AR_SceneIndex.GetHierarchy(doc)
+    indices = [hierarchy.Find(source) for source in sources] # Positions of the sources, the copies have the same hierarchy
+    size = (endFrame-startFrame) // count + 1 # Frames per chunk
+    threads = [] # Initialize a list for worker threads
+    for first in range(startFrame, endFrame+1, size): # Iterate through chunks
+        clone = doc.GetClone(c4d.COPYFLAGS_DOCUMENT) # Copy of the document for the worker
+        objects = AR_SceneIndex.Hierarchy(clone).objects # Objects of the copy in Object Manager order
+        thread = SampleThread(clone, [objects[i] for i in indices], channels, world, first, min(first+size-1, endFrame))
+        threads.append(thread)
+    for thread in threads: # Copies are made before any worker starts
+        thread.Start()
+
+    cancelled = False # Is baking cancelled
+    frameCount = endFrame-startFrame+1 # Amount of sampled frames
+    while any(t.IsRunning() for t in threads): # Wait until workers are done
+        done = sum(len(t.frames) for t in threads) # Amount of sampled frames
+        c4d.StatusSetText("Baking %d / %d frames with %d threads (Esc to cancel)" % (done, frameCount, len(threads)))
+        c4d.StatusSetBar(int(100.0*done/frameCount)) # Progress percentage
+        if EscapePressed(): # If baking is cancelled
+            cancelled = True
+            for t in threads:
+                t.End(False) # Ask worker to stop
+        time.sleep(0.05)
+
+    frames = array.array('l') # Initialize an array for sampled frames
+    samples = NewSamples(channels, world) # Initialize value arrays, one per source and channel
+    for t in threads: # Merge chunks in frame order
+        t.End() # Make sure worker has stopped
+        frames.extend(t.frames)
+        for arrays, chunk in zip(samples, t.samples):
+            for values, part in zip(arrays, chunk):
+                values.extend(part)
+        t.doc.Flush() # Free the copy of the document
+    Record("Parallel sampling", start)
+    if cancelled or len(frames) != frameCount: # If baking was cancelled or a worker stopped early
+        return None
+    return frames, samples
+
+def SampleFrames(sources, channels, world, doc, frameList):
+    """ Steps through given frames and collects values of given channels to flat arrays """
+    fps = doc.GetFps() # Get Frame Rate
+    startFrame, endFrame = GetFrameRange(doc)
+    frames = array.array('l') # Initialize an array for sampled frames
+    samples = NewSamples(channels, world) # Initialize value arrays, one per source and channel
+
+    for k, i in enumerate(frameList): # Iterate through frames
+        if not Progress(i, startFrame, endFrame, k): # If baking is cancelled, progress is the position of the frame in the preview range
+            return None
+        SetCurrentFrame(i, doc) # Set current frame
+        frames.append(doc.GetTime().GetFrame(fps)) # Store current frame
+        start = timer() # Start profiling
+        SampleFrame(sources, channels, samples, world)
+        Record("Sampling", start)
+        RecordFrame(start)
+    return frames, samples
+
+def IsAdaptive(doc):
+    """ Checks if sub-frame samples can be added, frames of simulations have to be evaluated in order """
+    if subFrameDepth < 1 or (subFrameAngle <= 0 and subFrameDistance <= 0): # If adaptive sampling is disabled
+        return False
+    simulation = GetSimulation(doc)
+    if simulation is not None: # If frames have to be evaluated in order
+        print("Sub-frame samples are not added, %s depends on previous frames" % DescribeSimulation(simulation))
+        return False
+    return True
+
+def IsFast(items, channels, i, j):
+    """ Checks if position or angles change more than allowed between two samples """
+    distance = 0.0 # Squared distance between positions
+    angle = 0.0 # Largest change of an angle
+    for data, values in zip(items, channels): # Iterate through channels
+        if data[0] == 903: # Position
+            distance += (values[j]-values[i])**2
+        elif data[0] in angleChannels: # Rotation, field of view etc.
+            angle = max(angle, abs(values[j]-values[i]))
+    return ((subFrameDistance > 0 and distance > subFrameDistance**2) or
+            (subFrameAngle > 0 and angle > math.radians(subFrameAngle)))
+
+def GetSubFrames(items, times, channels):
+    """ Returns times halfway between neighbouring samples that change too fast """
+    step = 1.0 / 2**subFrameDepth # Shortest distance between samples
+    return [(times[i]+times[i+1])/2.0 for i in range(len(times)-1) if times[i+1]-times[i] > step and IsFast(items, channels, i, i+1)]
+
+def SampleSubFrames(sources, channels, world, doc, times):
+    """ Steps through given sub-frame times and collects values of given channels, returns None if baking is cancelled """
+    startFrame, endFrame = GetFrameRange(doc)
+    samples = NewSamples(channels, world) # Initialize value arrays, one per source and channel
+    for k, t in enumerate(times): # Iterate through sub-frames
+        if not Progress(t, startFrame, endFrame, k): # If baking is cancelled, progress is the position of the sub-frame in the preview range
+            return None
+        SetCurrentFrame(t, doc) # Set current time between frames
+        start = timer() # Start profiling
+        SampleFrame(sources, channels, samples, world)
+        Record("Sampling", start)
+    return samples
+
+def Refine(sources, channels, world, doc, frames, samples):
+    """ Adds sub-frame samples where sources move fast. Returns sample times and samples per source, None if baking is cancelled """
+    times = [array.array('d', frames) for source in sources] # Sample times of every source
+    for level in range(subFrameDepth): # Every level halves the distance between samples
+        needed = [GetSubFrames(items, t, arrays) for items, t, arrays in zip(channels, times, samples)] # Sub-frames of every source
+        union = sorted(set(t for subFrames in needed for t in subFrames)) # Every sub-frame is evaluated once for all sources
+        if not union: # If every source is sampled densely enough
+            break
+        c4d.StatusSetText("Adding %d sub-frame samples" % len(union))
+        added = SampleSubFrames(sources, channels, world, doc, union)
+        if added is None: # If baking was cancelled
+            return None
+        lookup = dict((t, n) for n, t in enumerate(union)) # Sample index of every sub-frame
+        for k, source in enumerate(sources): # Merge sub-frames of every source to its samples
+            order = source[c4d.ID_BASEOBJECT_ROTATION_ORDER] # Get rotation order
+            decomposed = Decompose(added[k], order) if world else added[k] # Position, rotation and scale of the sub-frames
+            merged = sorted([(t, 0, i) for i, t in enumerate(times[k])] + [(t, 1, lookup[t]) for t in needed[k]]) # [time, is new sample, index]
+            times[k] = array.array('d', [t for t, new, i in merged])
+            samples[k] = [array.array('d', [(part if new else values)[i] for t, new, i in merged]) for values, part in zip(samples[k], decomposed)]
+            Unwrap(samples[k][3:6], order) # Sub-frame rotations continue from neighbouring samples
+    return times, samples
+
+def GetTolerance(data):
+    """ Returns reduction tolerance in the units of the channel """
+    if data[0] in angleChannels: # If channel is an angle
+        return math.radians(keyTolerance) # Tolerance is given in degrees
+    return keyTolerance
+
+def IsConstant(values, tolerance):
+    """ Checks if all values stay within tolerance from the first value """
+    first = values[0] # The first value
+    for value in values: # Iterate through values
+        if abs(value - first) > tolerance: # If value changes too much
+            return False
+    return True
+
+def GetSlope(times, values, i):
+    """ Returns slope of the sampled curve at given index """
+    last = len(values)-1 # Last index
+    a = max(i-1, 0) # Previous sample
+    b = min(i+1, last) # Next sample
+    if a == b: # If there is only one sample
+        return 0.0
+    return (values[b] - values[a]) / float(times[b] - times[a])
+
+def Hermite(t0, v0, m0, t1, v1, m1, t):
+    """ Evaluates cubic hermite segment at given time """
+    h = float(t1 - t0) # Segment length
+    s = (t - t0) / h # Normalized position in segment
+    s2 = s * s
+    s3 = s2 * s
+    return ((2*s3 - 3*s2 + 1) * v0 + (s3 - 2*s2 + s) * h * m0 +
+            (-2*s3 + 3*s2) * v1 + (s3 - s2) * h * m1)
+
+def ReduceKeys(times, values, tolerance, first=0, last=None):
+    """ Splits the curve at the worst fitting sample until every segment is within tolerance (Ramer-Douglas-Peucker with spline tangents) """
+    if last is None: # If whole curve is reduced
+        last = len(values)-1 # Last index
+    slopes = {first: GetSlope(times, values, first), last: GetSlope(times, values, last)} # Fitted tangents of kept keys
+    segments = [(first, last)] # Segments to check
+    while segments: # Iterate until every segment fits
+        a, b = segments.pop() # Get segment
+        worst = None # Index of the worst fitting sample
+        error = tolerance + 1e-7 # Largest allowed error, floating point noise is ignored
+        for i in range(a+1, b): # Iterate through samples inside the segment
+            fit = Hermite(times[a], values[a], slopes[a], times[b], values[b], slopes[b], times[i])
+            if abs(fit - values[i]) > error: # If sample is worse than earlier ones
+                worst = i
+                error = abs(fit - values[i])
+        if worst is not None: # If segment does not fit
+            slopes[worst] = GetSlope(times, values, worst) # Keep the worst sample as a key
+            segments.append((a, worst))
+            segments.append((worst, b))
+    return sorted(slopes), slopes
+
+def ReduceSteps(values, first=0, last=None):
+    """ Returns indices where stepped value changes """
+    if last is None: # If whole curve is reduced
+        last = len(values)-1 # Last index
+    indices = [first] # The first key is always kept
+    for i in range(first+1, last+1): # Iterate through values
+        if values[i] != values[i-1]: # If value changes
+            indices.append(i)
+    if indices[-1] != last: # The last key is always kept
+        indices.append(last)
+    return indices
+
+def SetTangents(curve, key, slope, leftLength, rightLength, fps):
+    """ Sets spline tangents of the key from slope (value per frame) and neighbouring key distances (frames) """
+    key.SetInterpolation(curve, c4d.CINTERPOLATION_SPLINE)
+    key.ChangeNBit(c4d.NBIT_CKEY_AUTO, c4d.NBITCONTROL_CLEAR) # Disable auto tangents
+    key.ChangeNBit(c4d.NBIT_CKEY_CLAMP, c4d.NBITCONTROL_CLEAR) # Disable clamp
+    key.SetTimeLeft(curve, c4d.BaseTime(-leftLength/3.0/fps)) # Tangent length is third of the segment
+    key.SetValueLeft(curve, -slope*leftLength/3.0)
+    key.SetTimeRight(curve, c4d.BaseTime(rightLength/3.0/fps))
+    key.SetValueRight(curve, slope*rightLength/3.0)
+
+def WriteTrack(target, data, frames, values, doc):
+    """ Reduces the sampled channel and writes the remaining keys to a new track """
+    desc = GetDescID(data) # Get DescID of the channel
+    if target.FindCTrack(desc): # If channel is already baked
+        return
+    track = c4d.CTrack(target, desc) # Initialize CTrack
+    target.InsertTrackSorted(track) # Insert CTrack to the object
+    name = target.GetName()+" "+track.GetName() # Name for the report
+    tolerance = GetTolerance(data) # Get reduction tolerance
+    if IsConstant(values, tolerance): # If channel does not change
+        track.Remove() # Track is not needed
+        SetValue(target, data, values[0]) # Keep the value as a static parameter
+        print("%s: %d -> 0 keys" % (name, len(values)))
+        return
+
+    start = timer() # Start profiling
+    slopes = {} # Fitted tangents, only float channels have them
+    if data[1] == c4d.DTYPE_REAL: # Float
+        indices, slopes = ReduceKeys(frames, values, tolerance)
+    else: # If boolean or integer
+        indices = ReduceSteps(values)
+    Record("Key reduction", start)
+
+    start = timer() # Start profiling
+    curve = track.GetCurve() # Get Curve of the CTrack
+    for k in range(len(indices)): # Iterate through kept samples
+        WriteKey(curve, data, frames, values, indices, k, slopes, doc)
+    Record("Key writing", start)
+    print("%s: %d -> %d keys" % (name, len(values), len(indices)))
+
+def AddKey(curve, data, frame, value, doc):
+    """ Adds a key with the value to the curve, stepped channels get step interpolation. Returns the key """
+    added = curve.AddKey(c4d.BaseTime(frame, doc.GetFps()), False) # Add keyframe without undo
+    key = added["key"]
+    curve.SetKeyDefault(doc, added["nidx"]) # Apply default interpolation
+    key.SetValue(curve, value)
+    if data[1] == c4d.DTYPE_BOOL: # If boolean
+        key.SetGeData(curve, bool(value)) # Keyframe value needs to be set with SetGeData
+        key.SetInterpolation(curve, c4d.CINTERPOLATION_STEP)
+    elif data[1] == c4d.DTYPE_LONG: # If integer
+        key.SetGeData(curve, int(value)) # Keyframe value needs to be set with SetGeData
+        key.SetInterpolation(curve, c4d.CINTERPOLATION_STEP)
+    return key
+
+def WriteKey(curve, data, frames, values, indices, k, slopes, doc):
+    """ Adds a key for the kept sample, tangents are fitted to neighbouring kept samples """
+    fps = doc.GetFps() # Get Frame Rate
+    i = indices[k] # Index of the sample
+    key = AddKey(curve, data, frames[i], values[i], doc)
+    if data[1] == c4d.DTYPE_REAL: # Float
+        left = frames[i] - frames[indices[k-1]] if k > 0 else 0 # Distance to previous key
+        right = frames[indices[k+1]] - frames[i] if k < len(indices)-1 else 0 # Distance to next key
+        SetTangents(curve, key, slopes[i], left or right, right or left, fps)
+
+def GetKeyFrames(curve, fps):
+    """ Returns times of the keys in frames """
+    return [curve.GetKey(i).GetTime().Get()*fps for i in range(curve.GetKeyCount())]
+
+def IsWholeFrame(frame):
+    """ Checks if time in frames is on a frame, keys of sub-frame samples are between frames """
+    return abs(frame - round(frame)) < 1e-6
+
+def GetKeySlope(key, fps):
+    """ Returns slope of the key's spline tangent (value per frame) """
+    if key.GetTimeRight().Get() != 0: # If key has a right tangent
+        return key.GetValueRight() / (key.GetTimeRight().Get()*fps)
+    if key.GetTimeLeft().Get() != 0: # If key has a left tangent
+        return key.GetValueLeft() / (key.GetTimeLeft().Get()*fps)
+    return 0.0
+
+def SpliceTrack(target, data, first, last, frames, values, doc):
+    """ Replaces keys from the first to the last frame in the existing track with keys reduced from new samples.
+    Tangents of the keys just outside the splice are fitted again to the distances of the new keys """
+    fps = doc.GetFps() # Get Frame Rate
+    curve = target.FindCTrack(GetDescID(data)).GetCurve() # Get Curve of the baked track
+    for i in reversed(range(curve.GetKeyCount())): # Remove keys between, including the surrounding keys
+        frame = curve.GetKey(i).GetTime().Get()*fps
+        if first-1e-6 <= frame <= last+1e-6:
+            curve.DelKey(i)
+
+    start = timer() # Start profiling
+    slopes = {} # Fitted tangents of new keys per frame
+    a, b = frames.index(first), frames.index(last) # Sample indices of the surrounding keys
+    if data[1] == c4d.DTYPE_REAL: # Float
+        kept, fitted = ReduceKeys(frames, values, GetTolerance(data), a, b)
+        slopes = dict((frames[i], fitted[i]) for i in kept)
+    else: # If boolean or integer
+        kept = ReduceSteps(values, a, b)
+    Record("Key reduction", start)
+
+    start = timer() # Start profiling
+    for i in kept: # Iterate through kept samples
+        AddKey(curve, data, frames[i], values[i], doc)
+    if data[1] == c4d.DTYPE_REAL: # Tangent lengths depend on neighbouring keys
+        keyFrames = GetKeyFrames(curve, fps)
+        lo = min(i for i, frame in enumerate(keyFrames) if frame >= first-1e-6) # Index of the first new key
+        hi = max(i for i, frame in enumerate(keyFrames) if frame <= last+1e-6) # Index of the last new key
+        for i in range(max(lo-1, 0), min(hi+1, len(keyFrames)-1)+1): # Iterate through new keys and their neighbours
+            key = curve.GetKey(i)
+            if lo <= i <= hi: # If new key
+                slope = slopes[int(round(keyFrames[i]))]
+            elif key.GetInterpolation() == c4d.CINTERPOLATION_SPLINE: # If old spline key, its slope is kept
+                slope = GetKeySlope(key, fps)
+            else:
+                continue
+            left = keyFrames[i] - keyFrames[i-1] if i > 0 else 0 # Distance to previous key
+            right = keyFrames[i+1] - keyFrames[i] if i < len(keyFrames)-1 else 0 # Distance to next key
+            SetTangents(curve, key, slope, left or right, right or left, fps)
+    Record("Key writing", start)
+
+def ClearTracks(obj, items):
+    """ Removes tracks of given channels """
+    for data in items: # Iterate through channels
+        track = obj.FindCTrack(GetDescID(data))
+        if track: # If track exists
+            track.Remove()
+
+def GetLinks(bc, doc):
+    """ Returns objects that are linked in the container and its sub-containers, objects of InExclude and field lists included """
+    links = [] # Initialize a list for linked objects
+    for index, value in bc: # Iterate through container
+        if isinstance(value, c4d.BaseObject): # If link to an object
+            links.append(value)
+        elif isinstance(value, c4d.BaseContainer): # If sub-container (e.g. user data)
+            links.extend(GetLinks(value, doc))
+        elif isinstance(value, c4d.InExcludeData): # If object list (e.g. effectors of a Cloner)
+            links.extend(value.ObjectFromIndex(doc, i) for i in range(value.GetObjectCount()))
+        elif isinstance(value, c4d.FieldList): # If field list (e.g. fields of an effector)
+            links.extend(AR_SceneIndex.GetFieldListObjects(value, doc))
+    return [link for link in links if isinstance(link, c4d.BaseObject)] # Deleted objects and other linked elements are skipped
+
+def GetRelatedObjects(obj):
+    """ Returns the object and every object it can depend on: parents and objects linked from them or their tags """
+    doc = obj.GetDocument() # Linked objects of lists are looked up from the document
+    related = [] # Initialize a list for related objects
+    found = {} # Related objects by GUID, copies of an object can share the GUID
+    queue = collections.deque([obj]) # Objects to check
+    while queue: # Iterate until every related object is found
+        o = queue.popleft()
+        if o is None or any(o == r for r in found.get(o.GetGUID(), [])): # If no object or already found
+            continue
+        found.setdefault(o.GetGUID(), []).append(o)
+        related.append(o)
+        queue.append(o.GetUp()) # Parent
+        queue.extend(GetLinks(o.GetData(), doc)) # Linked objects, e.g. camera target
+        for t in o.GetTags(): # Iterate through tags
+            queue.extend(GetLinks(t.GetData(), doc)) # Linked objects, e.g. constraint targets
+    return related
+
+def GetTrackFingerprint(track):
+    """ Returns keys of the track as a string, None if the track has no curve """
+    curve = track.GetCurve() # Get Curve of the CTrack
+    if curve is None: # If track can't be compared
+        return None
+    keys = [] # Initialize a list for keys
+    for i in range(curve.GetKeyCount()): # Iterate through keys
+        key = curve.GetKey(i)
+        keys.append("%r %r %d %r %r %r %r" % (key.GetTime().Get(), key.GetValue(), key.GetInterpolation(),
+                                              key.GetTimeLeft().Get(), key.GetValueLeft(), key.GetTimeRight().Get(), key.GetValueRight()))
+    return ";".join(keys)
+
+def GetFingerprint(obj):
+    """ Returns fingerprints of every track the object depends on, None if the object can change without keyframes """
+    fingerprint = [] # Initialize a list for [track name, keys]
+    for i, o in enumerate(GetRelatedObjects(obj)): # Iterate through related objects
+        for item in [o] + [t for t in o.GetTags() if not IsBakeTag(t)]: # Iterate through object and its tags
+            if item.GetType() in unpredictableTypes or item.GetType() in simulationTypes: # If changes can't be predicted from keyframes
+                return None
+            for track in item.GetCTracks(): # Iterate through tracks
+                keys = GetTrackFingerprint(track)
+                if keys is None:
+                    return None
+                fingerprint.append([ToUnicode("%d %s" % (i, track.GetName())), keys])
+    return fingerprint
+
+def ToUnicode(text):
+    """ Returns the text as unicode, names from Cinema 4D are UTF-8 byte strings and names loaded from JSON are unicode """
+    if isinstance(text, bytes): # If byte string
+        return text.decode("utf-8")
+    return text
+
+def MergeRanges(ranges):
+    """ Merges overlapping and adjacent frame ranges """
+    merged = [] # Initialize a list for merged ranges
+    for a, b in sorted(ranges): # Iterate through ranges in order
+        if merged and a <= merged[-1][1]+1: # If range continues the previous one
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return merged
+
+def GetDirtyRanges(old, new, fps, startFrame, endFrame):
+    """ Compares track fingerprints and returns frame ranges that can have changed, None if tracks were added or removed """
+    if [ToUnicode(o[0]) for o in old] != [ToUnicode(n[0]) for n in new]: # If tracks are not the same, names from JSON are unicode
+        return None
+    ranges = [] # Initialize a list for changed ranges
+    for (name, oldKeys), (name, newKeys) in zip(old, new): # Iterate through tracks
+        if oldKeys == newKeys: # If track did not change
+            continue
+        oldKeys = oldKeys.split(";") if oldKeys else []
+        newKeys = newKeys.split(";") if newKeys else []
+        times = sorted(set(float(k.split(" ")[0]) for k in oldKeys + newKeys)) # Key times of both curves
+        for k in set(oldKeys).symmetric_difference(newKeys): # Iterate through changed keys
+            i = times.index(float(k.split(" ")[0]))
+            a = int(math.floor(times[i-2]*fps)) if i >= 2 else startFrame # Auto tangents reach two keys away
+            b = int(math.ceil(times[i+2]*fps)) if i+2 < len(times) else endFrame
+            if a <= endFrame and b >= startFrame: # If change is inside the preview range
+                ranges.append([max(a, startFrame), min(b, endFrame)])
+    return MergeRanges(ranges)
+
+def GetChannelString(items):
+    """ Returns baked channels as a string """
+    return ";".join(" ".join(str(value) for value in data) for data in items)
+
+def IsBakeTag(tag):
+    """ Checks if the tag stores bake data of these scripts """
+    return tag.GetType() == c4d.Tpython and tag.GetName() == bakeTagName
+
+def IsCacheTag(tag):
+    """ Checks if the tag reads a point cache file of AR_BakeObjectPLA """
+    return tag.GetType() == c4d.Tpython and tag.GetName() == cacheTagName
+
+def GetBakeTag(obj):
+    """ Returns the bake data tag of the object, None if the object was not baked with these scripts """
+    for t in obj.GetTags(): # Iterate through tags
+        if IsBakeTag(t):
+            return t
+    return None
+
+def AddUserData(tag, name, dtype):
+    """ Adds user data of given type to the tag """
+    bc = c4d.GetCustomDatatypeDefault(dtype) # Initialize user data
+    bc[c4d.DESC_NAME] = name # Set user data name
+    bc[c4d.DESC_SHORT_NAME] = name # Set short name
+    bc[c4d.DESC_ANIMATE] = c4d.DESC_ANIMATE_OFF # Bake data is not animated
+    return tag.AddUserData(bc) # Add user data
+
+def GetBakeData(obj):
+    """ Returns bake data of the baked object as a dictionary, None if the object was not baked with these scripts """
+    tag = GetBakeTag(obj)
+    if tag is None: # If object is not a bake
+        return None
+    try:
+        data = json.loads(tag[c4d.ID_USERDATA, 2]) # Settings, frame range and track fingerprints
+    except (TypeError, ValueError): # If bake data is missing or broken
+        return None
+    data["source"] = tag[c4d.ID_USERDATA, 1] # Baked object
+    return data
+
+def StoreBakeData(target, source, items, mode, frames):
+    """ Stores source link, settings, frame range and track fingerprints to a hidden tag of the baked object for incremental re-baking.
+    Samples are not stored, changed frames are sampled again from the source """
+    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
+    start = timer() # Start profiling
+    tag = GetBakeTag(target)
+    if tag is None: # If target is a new bake
+        tag = c4d.BaseTag(c4d.Tpython) # Registered tag type that does nothing when disabled
+        tag.SetName(bakeTagName)
+        tag[c4d.TPYTHON_CODE] = "# Bake data of AR_Bake, the tag is disabled and does nothing"
+        tag[c4d.EXPRESSION_ENABLE] = False # Disable the tag
+        tag.ChangeNBit(c4d.NBIT_OHIDE, c4d.NBITCONTROL_SET) # Hide the tag from the Object Manager
+        AddUserData(tag, "Source", c4d.DTYPE_BASELISTLINK)
+        AddUserData(tag, "Bake data", c4d.DTYPE_STRING)
+        target.InsertTag(tag)
+    data = {"mode": mode, # Bake mode
+            "range": [int(frames[0]), int(frames[-1])], # First and last frame
+            "tolerance": keyTolerance, # Reduction tolerance
+            "fps": doc.GetFps(), # Frame Rate
+            "channels": GetChannelString(items), # Baked channels
+            "fingerprint": GetFingerprint(source)} # Track fingerprints, None if source can't be re-baked incrementally
+    tag[c4d.ID_USERDATA, 1] = source
+    tag[c4d.ID_USERDATA, 2] = json.dumps(data)
+    Record("Storing bake data", start)
+
+def FindBaked(source, mode, doc):
+    """ Returns earlier bake of the source object. Copies of a bake can't be told apart from the original,
+    so if several objects claim the same bake their bake data is removed and a new bake is made """
+    found = [] # Initialize a list for earlier bakes
+    for obj, depth in AR_SceneIndex.Walk(doc.GetFirstObject()): # Iterate through every object
+        data = GetBakeData(obj)
+        if data is not None and data.get("mode") == mode and data["source"] == source: # If bake of the source
+            found.append(obj)
+    if len(found) == 1: # If bake is unambiguous
+        return found[0]
+    for obj in found: # Iterate through copies
+        tag = GetBakeTag(obj)
+        doc.AddUndo(c4d.UNDOTYPE_DELETEOBJ, tag) # Add undo command for deleting a tag
+        tag.Remove() # Copy is not updated anymore
+    if found: # If there were copies
+        print("%s: %d objects claim to be its bake, baking a new one" % (source.GetName(), len(found)))
+    return None
+
+def GetRebakeRanges(source, target, items, mode, doc):
+    """ Returns frame ranges that have to be baked again, None if everything has to be baked """
+    data = GetBakeData(target)
+    if data is None or not incremental: # If target is a new bake
+        return None
+    fps = doc.GetFps() # Get Frame Rate
+    startFrame, endFrame = GetFrameRange(doc)
+    if (data.get("mode") != mode or data.get("range") != [startFrame, endFrame] or data.get("tolerance") != keyTolerance or
+        data.get("fps") != fps or data.get("channels") != GetChannelString(items) or data.get("fingerprint") is None): # If settings or baked channels changed
+        return None
+    fingerprint = GetFingerprint(source)
+    if fingerprint is None: # If source changed to something that can't be predicted
+        return None
+    return GetDirtyRanges(data["fingerprint"], fingerprint, fps, startFrame, endFrame)
+
+def GetBakedValue(target, data, curve, frame, fps):
+    """ Returns value of the earlier bake at given frame """
+    if curve is None: # If channel was constant
+        return GetValue(target, data)
+    return curve.GetValue(c4d.BaseTime(frame, fps), fps)
+
+def GetWindow(keyFrames, a, b, startFrame, endFrame):
+    """ Returns keys around a changed frame range, keys between them are reduced again. Tangents of the surrounding keys must not depend on changed samples """
+    keyed = [int(round(frame)) for frame in keyFrames if IsWholeFrame(frame) and startFrame <= frame <= endFrame] # Keys of sub-frame samples can't be window ends
+    return [max([frame for frame in keyed if frame < a-1] or [startFrame]), min([frame for frame in keyed if frame > b+1] or [endFrame])]
+
+def SampleInto(sampled, source, items, world, frameList, doc):
+    """ Samples given frames of the source to a dictionary of frame: channel values, returns False if baking is cancelled """
+    if not frameList: # If there is nothing to sample
+        return True
+    result = SampleFrames([source], [items], world, doc, frameList)
+    if result is None: # If baking was cancelled
+        return False
+    frames, samples = result
+    samples = samples[0] # Samples of the source
+    if world: # If global matrices were sampled
+        samples = Decompose(samples, source[c4d.ID_BASEOBJECT_ROTATION_ORDER])
+    for n, frame in enumerate(frames): # Iterate through sampled frames
+        sampled[frame] = [values[n] for values in samples]
+    return True
+
+def Collect(sampled, target, items, curves, order, fps):
+    """ Returns sampled frames and value arrays per channel in frame order, rotations continue the earlier bake """
+    frames = array.array('l', sorted(sampled))
+    samples = [array.array('d', [sampled[frame][c] for frame in frames]) for c in range(len(items))]
+    heading, pitch, bank = samples[3:6] # Rotation channels
+    for n, frame in enumerate(frames): # Iterate through sampled frames
+        if n > 0 and frame == frames[n-1]+1: # If previous frame was sampled
+            previous = (heading[n-1], pitch[n-1], bank[n-1])
+        else:
+            previous = tuple(GetBakedValue(target, data, curve, frame, fps) for data, curve in zip(items[3:6], curves[3:6]))
+        heading[n], pitch[n], bank[n] = ClosestRotation(previous, (heading[n], pitch[n], bank[n]), order)
+    return frames, samples
+
+def Resample(source, target, items, world, ranges, adaptive, doc):
+    """ Samples the source again at changed frames and checks that keys of the earlier bake still match the source.
+    Channels that leave the earlier curve are sampled between the keys around the change.
+    Returns [first, last, frames, values] splices per channel, False if everything has to be baked again, None if baking is cancelled """
+    fps = doc.GetFps() # Get Frame Rate
+    startFrame, endFrame = GetFrameRange(doc)
+    order = source[c4d.ID_BASEOBJECT_ROTATION_ORDER] # Get rotation order
+    curves = [] # Curves of the earlier bake, constant channels have none
+    for data in items: # Iterate through channels
+        track = target.FindCTrack(GetDescID(data))
+        curves.append(track.GetCurve() if track else None)
+    keyFrames = [GetKeyFrames(curve, fps) if curve else [] for curve in curves]
+    changed = set(i for a, b in ranges for i in range(a, b+1)) # Frames that can have changed
+    around = set(i for a, b in ranges for i in range(max(a-1, startFrame), min(b+1, endFrame)+1)) # Changed frames and their neighbours
+    keyed = set(int(round(frame)) for keys in keyFrames for frame in keys if IsWholeFrame(frame) and startFrame <= frame <= endFrame) # Frames with keys
+    unchanged = sorted(keyed - around) or [i for i in range(startFrame, endFrame+1) if i not in around] # Kept keys are verified
+    checks = unchanged[::max(len(unchanged)//validationFrames, 1)][:validationFrames] # Frames to verify
+    sampled = {} # Sampled values of every frame
+    if not SampleInto(sampled, source, items, world, sorted(around.union(checks)), doc): # If baking was cancelled
+        return None
+    frames, samples = Collect(sampled, target, items, curves, order, fps)
+
+    windows = [] # Frame ranges that are keyed again per channel
+    for data, curve, keys, values in zip(items, curves, keyFrames, samples): # Iterate through channels
+        tolerance = GetTolerance(data)
+        if curve is None: # If constant channel, it has to stay constant
+            value = GetValue(target, data)
+            if any(abs(v - value) > tolerance for v in values):
+                return False
+            windows.append([])
+        elif any(abs(values[n] - GetBakedValue(target, data, curve, frame, fps)) > tolerance for n, frame in enumerate(frames) if frame in changed): # If changed frames leave the earlier curve
+            windows.append(MergeRanges([GetWindow(keys, a, b, startFrame, endFrame) for a, b in ranges]))
+        else:
+            windows.append([])
+    needed = set() # Frames that are keyed again and their neighbours
+    for channelWindows in windows:
+        for first, last in channelWindows:
+            needed.update(range(max(first-1, startFrame), min(last+1, endFrame)+1)) # Neighbouring samples give slopes of the surrounding keys
+    if not SampleInto(sampled, source, items, world, sorted(needed.difference(sampled)), doc): # If baking was cancelled
+        return None
+    frames, samples = Collect(sampled, target, items, curves, order, fps)
+
+    lookup = dict((frame, n) for n, frame in enumerate(frames)) # Sample index of every frame
+    for curve, keys, values in zip(curves, keyFrames, samples): # Verify stage
+        for i, frame in enumerate(keys): # Iterate through keys
+            frame = int(round(frame)) if IsWholeFrame(frame) else None
+            if curve is not None and frame in lookup and frame not in changed: # If kept sample was sampled again
+                if abs(curve.GetKey(i).GetValue() - values[lookup[frame]]) > 1e-6: # If frame changed without keyframe changes
+                    return False
+    if adaptive: # Sub-frame samples can't be spliced
+        run = 0 # Index where consecutive frames start
+        for n in range(1, len(frames)+1):
+            if n == len(frames) or frames[n] != frames[n-1]+1: # If run of consecutive frames ends
+                if GetSubFrames(items, frames[run:n], [values[run:n] for values in samples]):
+                    return False
+                run = n
+
+    splices = [] # Initialize a list for splices of every channel
+    for channelWindows, values in zip(windows, samples):
+        splices.append([])
+        for first, last in channelWindows: # Iterate through windows of the channel
+            a, b = lookup[max(first-1, startFrame)], lookup[min(last+1, endFrame)]
+            splices[-1].append([first, last, frames[a:b+1], values[a:b+1]])
+    return splices
+
+def Bake(sources, targets, channels, static, mode, world):
+    """ Bakes given channels of sources to targets by stepping through the preview range only once, returns False if baking is cancelled.
+    Channels of every source start with PSR (psrVault), static values are set without tracks """
+    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
+    if len(sources) == 0: # If there is nothing to bake
+        return True
+    startFrame, endFrame = GetFrameRange(doc)
+    frames = array.array('l', range(startFrame, endFrame+1)) # Baked frames
+    adaptive = IsAdaptive(doc) # Are sub-frame samples added
+
+    full = [] # Indices of sources that are baked completely
+    spliced = [] # Sources that are re-baked incrementally: [index, splices per channel]
+    for k in range(len(sources)): # Incremental sampling stage
+        ranges = GetRebakeRanges(sources[k], targets[k], channels[k], mode, doc)
+        if ranges is None: # If everything has to be baked
+            full.append(k)
+            continue
+        splices = Resample(sources[k], targets[k], channels[k], world, ranges, adaptive, doc)
+        if splices is None: # If baking was cancelled, nothing is written
+            return False
+        if splices is False: # If earlier bake does not match the source
+            full.append(k)
+        else:
+            spliced.append([k, splices])
+
+    samples = [] # Samples of complete bakes
+    if full:
+        result = Sample([sources[k] for k in full], [channels[k] for k in full], world, doc) # Sampling stage
+        if result is None: # If baking was cancelled, nothing is written
+            return False
+        frames, samples = result
+
+    for n, k in enumerate(full): # Decomposition stage
+        order = sources[k][c4d.ID_BASEOBJECT_ROTATION_ORDER] # Get rotation order
+        if world: # If global matrices were sampled, local rotations are read from the parameters as they are
+            samples[n] = Decompose(samples[n], order) # Position, rotation and scale of the whole range
+        start = timer() # Start profiling
+        Unwrap(samples[n][3:6], order) # Euler continuity filter, local rotations can flip too (e.g. Target tag)
+        Record("Unwrapping", start)
+    times = [frames for k in full] # Sample times of every source
+    if full and adaptive: # Adaptive sampling stage
+        start = timer() # Start profiling
+        result = Refine([sources[k] for k in full], [channels[k] for k in full], world, doc, frames, samples)
+        if result is None: # If baking was cancelled, nothing is written
+            return False
+        times, samples = result
+        Record("Sub-frame sampling", start)
+
+    for k, sampleTimes, values in zip(full, times, samples): # Commit stage
+        ClearTracks(targets[k], channels[k] + [data for data, value in static[k]]) # Remove tracks from the source or from the earlier bake
+        for data, value in static[k]: # Iterate through static channels
+            SetValue(targets[k], data, value) # Static parameter, no track is needed
+        for data, sampled in zip(channels[k], values): # Iterate through changing channels
+            WriteTrack(targets[k], data, sampleTimes, sampled, doc) # Each track is created once
+        if incremental: # Bake data is stored only for re-baking
+            StoreBakeData(targets[k], sources[k], channels[k], mode, sampleTimes)
+        if len(sampleTimes) > len(frames): # If sub-frame samples were added
+            print("%s: %d sub-frame samples added" % (targets[k].GetName(), len(sampleTimes)-len(frames)))
+    for k, splices in spliced:
+        resampled = set() # Frames that were keyed again
+        for data, value in static[k]: # Iterate through static channels
+            SetValue(targets[k], data, value)
+        for data, channelSplices in zip(channels[k], splices): # Iterate through changing channels
+            for first, last, sampleTimes, sampled in channelSplices: # Iterate through changed windows
+                SpliceTrack(targets[k], data, first, last, sampleTimes, sampled, doc)
+                resampled.update(range(first, last+1))
+        StoreBakeData(targets[k], sources[k], channels[k], mode, frames)
+        print("%s: %d of %d frames baked again" % (targets[k].GetName(), len(resampled), len(frames)))
+    return True
+
+def Rollback(objects, doc):
+    """ Deletes objects that were created for a cancelled bake """
+    for obj in objects: # Iterate through objects
+        doc.AddUndo(c4d.UNDOTYPE_DELETEOBJ, obj) # Add undo command for deleting an object
+        obj.Remove() # Delete object
+
+def main():
+    """ Prints the current settings of the shared baking pipeline """
+    for name in settingNames: # Iterate through settings
+        print("%s: %s" % (name, globals()[name]))
+    print("NumPy decomposition: %s" % ("available" if numpy is not None else "not available"))
+
+# Execute main()
+if __name__=='__main__':
+    main()
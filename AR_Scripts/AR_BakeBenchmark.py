@@ -0,0 +1,169 @@
+"""
+AR_BakeBenchmark
+
+Author: Arttu Rautio (aturtur)
+Website: http://aturtur.com/
+Name-US: AR_BakeBenchmark
+Version: 1.0
+Description-US: Times camera baking in a new test document and prints the results to the console. The active document is not changed.
+
+Written for Maxon Cinema 4D R21.207
+Python version 2.7.14
+"""
+# ----------------------------------------------------------------------------------------------------------------------------------------------
+frameCount = 1000 # Length of the preview range of the test document
+runs = 3 # Every variant is timed this many times, the fastest run is reported
+# ----------------------------------------------------------------------------------------------------------------------------------------------
+# Libraries
+import c4d
+import os
+import sys
+import math
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_Bake
+import AR_BakeCameras
+
+# Functions
+def AddKeys(obj, data, keys, doc):
+    """ Animates the data vault item of the object with given [frame, value] keys """
+    track = c4d.CTrack(obj, AR_Bake.GetDescID(data)) # Initialize CTrack
+    obj.InsertTrackSorted(track) # Insert CTrack to the object
+    curve = track.GetCurve() # Get Curve of the CTrack
+    for frame, value in keys: # Iterate through keys
+        key = curve.AddKey(c4d.BaseTime(frame, doc.GetFps()))["key"]
+        track.FillKey(doc, obj, key)
+        key.SetValue(curve, value)
+
+def CreateScene():
+    """ Returns a new document with an animated camera, the preview range is frameCount frames long """
+    doc = c4d.documents.BaseDocument() # Initialize a document
+    doc.SetName("AR_BakeBenchmark")
+    fps = doc.GetFps() # Get Frame Rate
+    last = c4d.BaseTime(frameCount-1, fps) # Last frame
+    doc.SetMinTime(c4d.BaseTime(0))
+    doc.SetMaxTime(last)
+    doc.SetLoopMinTime(c4d.BaseTime(0))
+    doc.SetLoopMaxTime(last)
+    camera = c4d.BaseObject(c4d.Ocamera) # Initialize a camera object
+    camera.SetName("Benchmark Camera")
+    doc.InsertObject(camera)
+    middle = (frameCount-1)//2 # Middle frame
+    AddKeys(camera, [903, c4d.DTYPE_REAL, 1000, c4d.DTYPE_VECTOR], [[0, -500.0], [middle, 300.0], [frameCount-1, 500.0]], doc) # Position X
+    AddKeys(camera, [903, c4d.DTYPE_REAL, 1002, c4d.DTYPE_VECTOR], [[0, -800.0], [frameCount-1, -200.0]], doc) # Position Z
+    AddKeys(camera, [904, c4d.DTYPE_REAL, 1000, c4d.DTYPE_VECTOR], [[0, 0.0], [frameCount-1, 4*math.pi]], doc) # Heading, two full turns
+    AddKeys(camera, [904, c4d.DTYPE_REAL, 1001, c4d.DTYPE_VECTOR], [[0, -0.3], [middle, 0.3], [frameCount-1, -0.3]], doc) # Pitch
+    AddKeys(camera, [500, c4d.DTYPE_REAL], [[0, 36.0], [frameCount-1, 85.0]], doc) # Focal Length
+    return doc, camera
+
+def NewTarget(camera, doc):
+    """ Returns a copy of the camera without tracks to bake to """
+    target = camera.GetClone() # Initialize the baked camera
+    for track in target.GetCTracks(): # Iterate through tracks
+        track.Remove()
+    target.SetName(camera.GetName()+"_baked")
+    doc.InsertObject(target)
+    return target
+
+def PerKeyBake(source, target, doc):
+    """ Baseline: every frame finds the track of every channel and adds one key to it """
+    fps = doc.GetFps() # Get Frame Rate
+    startFrame, endFrame = AR_Bake.GetFrameRange(doc)
+    for i in range(startFrame, endFrame+1): # Iterate through Preview Range
+        AR_Bake.SetCurrentFrame(i, doc) # Set current frame
+        frame = doc.GetTime().GetFrame(fps) # Get current frame
+        for data in AR_BakeCameras.dataVault: # Iterate through data vault
+            desc = AR_Bake.GetDescID(data)
+            value = AR_Bake.GetValue(source, data)
+            track = target.FindCTrack(desc) # Try to find CTrack
+            if not track: # If CTrack does not exists
+                track = c4d.CTrack(target, desc) # Initialize CTrack
+                target.InsertTrackSorted(track) # Insert CTrack to the object
+            curve = track.GetCurve() # Get Curve of the CTrack
+            key = curve.AddKey(c4d.BaseTime(frame, fps))["key"]
+            track.FillKey(doc, target, key)
+            key.SetValue(curve, value)
+            if data[1] != c4d.DTYPE_REAL: # If boolean or integer
+                key.SetGeData(curve, value) # Keyframe value needs to be set with SetGeData
+
+def BufferedBake(source, target, doc):
+    """ Samples every channel of the source directly to arrays and writes each track once """
+    AR_Bake.Bake([source], [target], [list(AR_BakeCameras.dataVault)], [[]], "Camera", True)
+
+def DummyCamera(camera, doc):
+    """ Returns the dummy camera that baking used before, a Python tag at priority 449 copies the camera to it every frame """
+    dummy = c4d.BaseObject(c4d.Ocamera) # Initialize a camera object
+    dummy.SetName("Dummy "+camera.GetName())
+    doc.InsertObject(dummy, None, doc.GetObjects()[-1]) # Dummy is evaluated after every other object
+    tag = c4d.BaseTag(c4d.Tpython) # Initialize python tag
+    dummy.InsertTag(tag)
+    priority = c4d.PriorityData() # Initialize a priority data
+    priority.SetPriorityValue(c4d.PRIORITYVALUE_MODE, c4d.CYCLE_GENERATORS) # Set priority to 'Generators'
+    priority.SetPriorityValue(c4d.PRIORITYVALUE_PRIORITY, 449) # Set priority value to last possible value
+    priority.SetPriorityValue(c4d.PRIORITYVALUE_CAMERADEPENDENT, False)
+    tag[c4d.EXPRESSION_PRIORITY] = priority
+    tag[c4d.TPYTHON_FRAME] = True # Set frame dependent to true
+    bc = c4d.GetCustomDatatypeDefault(c4d.DTYPE_BASELISTLINK) # Initialize user data
+    bc[c4d.DESC_NAME] = "Object"
+    tag[tag.AddUserData(bc)] = camera # Link to the camera
+    ids = sorted(set(data[0] for data in AR_BakeCameras.dataVault if data[0] not in (903, 904, 905))) # Copied camera parameters
+    tag[c4d.TPYTHON_CODE] = ("import c4d\n"
+                             "def main():\n"
+                             "\tcam = op[c4d.ID_USERDATA,1]\n"
+                             "\tobj = op.GetObject()\n"
+                             "\tobj.SetMg(cam.GetMg())\n" +
+                             "".join("\tobj[%d] = cam[%d]\n" % (i, i) for i in ids)) # Python tag script
+    return dummy
+
+def DummyBake(source, target, doc):
+    """ Baseline: samples a dummy camera that copies the source, the dummy is created and removed by every bake """
+    dummy = DummyCamera(source, doc)
+    doc.ExecutePasses(None, True, True, True, 0) # Animate the dummy once before baking
+    BufferedBake(dummy, target, doc)
+    dummy.Remove() # Delete dummy camera
+
+def Measure(variant, camera, doc):
+    """ Returns the fastest time of the variant in seconds, the baked camera is removed after every run """
+    best = None # Fastest run
+    for i in range(runs): # Iterate through runs
+        target = NewTarget(camera, doc) # Every run bakes to a new camera
+        start = AR_Bake.timer() # Start timing
+        variant(camera, target, doc)
+        elapsed = AR_Bake.timer()-start
+        target.Remove()
+        if best is None or elapsed < best: # If run was the fastest one
+            best = elapsed
+    return best
+
+def Compare(name, baseline, optimized, camera, doc):
+    """ Times both variants and prints them with the speedup """
+    c4d.StatusSetText("Benchmarking %s" % name)
+    before = Measure(baseline, camera, doc)
+    after = Measure(optimized, camera, doc)
+    print("%s:" % name)
+    print("    %-28s %10.3f s" % (baseline.__name__, before))
+    print("    %-28s %10.3f s" % (optimized.__name__, after))
+    print("    %-28s %10.2fx" % ("Speedup", before/after if after > 0 else 0.0))
+
+def main():
+    """ The first function to run """
+    active = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
+    doc, camera = CreateScene() # Test document
+    c4d.documents.InsertBaseDocument(doc)
+    c4d.documents.SetActiveDocument(doc) # Bakes evaluate the active document
+    AR_Bake.Setup(keyTolerance=0.01, headless=True, progressStep=10, profile=False, incremental=False,
+                  subFrameAngle=0.0, subFrameDistance=0.0, workers=1) # Same settings on every run
+    print("AR_BakeBenchmark: Cinema 4D %d, %d frames, %d channels, fastest of %d runs" % (c4d.GetC4DVersion(), frameCount, len(AR_BakeCameras.dataVault), runs))
+    try:
+        Compare("Key writing", PerKeyBake, BufferedBake, camera, doc)
+        Compare("Sampling", DummyBake, BufferedBake, camera, doc)
+    finally:
+        c4d.documents.KillDocument(doc) # Remove test document
+        c4d.documents.SetActiveDocument(active)
+        c4d.StatusClear()
+        c4d.EventAdd() # Refresh Cinema 4D
+
+# Execute main()
+if __name__=='__main__':
+    main()
@@ -5,15 +5,58 @@ Author: Arttu Rautio (aturtur)
 Website: http://aturtur.com/
 Name-US: AR_BakeObjectPLA
 Version: 1.0
-Description-US: Bakes quickly object to PLA animation
+Description-US: Bakes quickly object to PLA animation. SHIFT: Bakes to point cache file next to the document
 
 Written for Maxon Cinema 4D R21.207
 Python version 2.7.14
 """
+# ----------------------------------------------------------------------------------------------------------------------------------------------
+pointTolerance = 0.0 # Frames where no point moved more than this (cm) from the last keyed frame are not keyed. Set to 0 to skip only identical frames
+headless = True # If set true, interface is not updated while baking, which is faster. Progress is shown in the status bar, Esc cancels baking
+progressStep = 10 # Status bar is updated and Esc key is checked every n frames
+profile = False # If set true, time spent in every phase and frame is printed to the console and written as JSON file next to the document
+# ----------------------------------------------------------------------------------------------------------------------------------------------
 # Libraries
 import c4d
+import os
+import sys
+import array
+import struct
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_Bake
+
+# Global variables
+cacheHeader = "<4sIIiIf" # Point cache header: magic, version, point count, start frame, frame count, fps
 
 # Functions
+def GetKeyMod():
+    bc = c4d.BaseContainer() # Initialize a base container
+    keyMod = "None" # Initialize a keyboard modifier status
+    # Button is pressed
+    if c4d.gui.GetInputState(c4d.BFM_INPUT_KEYBOARD,c4d.BFM_INPUT_CHANNEL,bc):
+        if bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QSHIFT:
+            if bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QCTRL: # Ctrl + Shift
+                if bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QALT: # Alt + Ctrl + Shift
+                    keyMod = 'Alt+Ctrl+Shift'
+                else: # Shift + Ctrl
+                    keyMod = 'Ctrl+Shift'
+            elif bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QALT: # Alt + Shift
+                keyMod = 'Alt+Shift'
+            else: # Shift
+                keyMod = 'Shift'
+        elif bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QCTRL:
+            if bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QALT: # Alt + Ctrl
+                keyMod = 'Alt+Ctrl'
+            else: # Ctrl
+                keyMod = 'Ctrl'
+        elif bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QALT: # Alt
+            keyMod = 'Alt'
+        else: # No keyboard modifiers used
+            keyMod = 'None'
+        return keyMod
+
 def MakeEditable(op):
     if (op != None) and op.GetType() not in [5100, 5101]:
         clone = op.GetClone() # Get clone
@@ -36,90 +79,25 @@ def DisableDynamics(obj):
         if t.GetType() == 1018068: # If spline dynamics tag
             t[c4d.EXPRESSION_ENABLE] = False # Disable spline dynamics
 
-def DummyObject(obj, doc):
-    dummyObject = MakeEditable(obj) # Get clone from original object
-    RemoveTags(dummyObject) # Remove tags of the object
+def BakeObject(obj, doc):
+    bakeObject = MakeEditable(obj) # Get clone from original object
+    RemoveTags(bakeObject) # Remove tags of the object
     
     # Clean
-    if dummyObject.GetCTracks() != None:
-        for cTrack in dummyObject.GetCTracks(): cTrack.Remove() # Remove unnecessary tracks
-    ResetPSR(dummyObject) # Reset PSR
-    children = dummyObject.GetChildren() # Remove children
+    if bakeObject.GetCTracks() != None:
+        for cTrack in bakeObject.GetCTracks(): cTrack.Remove() # Remove unnecessary tracks
+    ResetPSR(bakeObject) # Reset PSR, points are baked in world space
+    bakeObject.SetFrozenPos(c4d.Vector(0)) # Reset frozen transformation too, MakeEditable keeps it from the source
+    bakeObject.SetFrozenRot(c4d.Vector(0))
+    bakeObject.SetFrozenScale(c4d.Vector(1))
+    children = bakeObject.GetChildren() # Remove children
     for c in children:
         c.Remove()
 
-    dummyObject.SetName("Dummy "+obj.GetName()) # Set name
-    doc.InsertObject(dummyObject) # Insert dummyObject to document
-    MoveToLast(dummyObject, doc) # Move new Object in the object hierarchy
-
-    xpressoTag = c4d.BaseTag(c4d.Texpresso) # Initialize a xpresso tag
-    dummyObject.InsertTag(xpressoTag)
-    prioritydata = c4d.PriorityData() # Initialize a priority data
-    prioritydata.SetPriorityValue(c4d.PRIORITYVALUE_MODE, c4d.CYCLE_GENERATORS) # Set priority to 'Generators'
-    prioritydata.SetPriorityValue(c4d.PRIORITYVALUE_PRIORITY, 449) # Set priority value to last possible value
-    prioritydata.SetPriorityValue(c4d.PRIORITYVALUE_CAMERADEPENDENT, False) # Set Object dependent to false
-    xpressoTag[c4d.EXPRESSION_PRIORITY] = prioritydata # Set priority data
-    
-    link1 = CreateUserDataLink(dummyObject, "Source", obj) # Create user data link
-    link2 = CreateUserDataLink(dummyObject, "Dummy", dummyObject) # Create user data link
-
-    nodemaster = xpressoTag.GetNodeMaster() # Get node master
-
-    # Create nodes
-    objectNodeA = nodemaster.CreateNode(nodemaster.GetRoot(), 400001000, None, x=0, y=100)
-    objectNodeB = nodemaster.CreateNode(nodemaster.GetRoot(), 400001000, None, x=300, y=0)
-    pythonNode = nodemaster.CreateNode(nodemaster.GetRoot(), 1022471, None, x=100, y=250)
-    pointNodeA = nodemaster.CreateNode(nodemaster.GetRoot(), 400001112, None, x=300, y=150)
-    pointNodeB = nodemaster.CreateNode(nodemaster.GetRoot(), 400001112, None, x=600, y=150)
-    iterationNode = nodemaster.CreateNode(nodemaster.GetRoot(), 400001131, None, x=350, y=300)
-
-    # Modify python node
-    pythonNode.RemoveUnusedPorts() # Remove default ports
-    pyInPort   = pythonNode.AddPort(c4d.GV_PORT_INPUT, 4013, c4d.GV_PORT_FLAG_IS_VISIBLE) # Add input link port
-    pyInPort.SetName("Input1") # Set port's name
-    pyOutPortA = pythonNode.AddPort(c4d.GV_PORT_OUTPUT, 4012, c4d.GV_PORT_FLAG_IS_VISIBLE) # Add output link port
-    pyOutPortA.SetName("Output1") # Set port's name
-    pyOutPortB = pythonNode.AddPort(c4d.GV_PORT_OUTPUT, 4000, c4d.GV_PORT_FLAG_IS_VISIBLE) # Add output integer port
-    pyOutPortB.SetName("Output2") # Set port's name
-    pythonNode[c4d.GV_PYTHON_CODE] = ("import c4d\n"
-                                     "def main():\n"
-                                     "\tglobal Output1\n"
-                                     "\tglobal Output2\n"
-                                     "\tif Input1.GetType() not in [5100, 5101]:"
-                                     "\t\tcache = Input1.GetCache()\n"
-                                     "\telse:\n"
-                                     "\t\tcache = Input1\n"
-                                     "\tpntCnt = len(cache.GetAllPoints())\n"
-                                     "\tOutput1 = cache\n"
-                                     "\tOutput2 = int(pntCnt)-1") # Python node's code
-
-    # Modify object node A
-    objectNodeA[c4d.GV_OBJECT_OBJECT_ID] = dummyObject
-    objPortA = objectNodeA.AddPort(c4d.GV_PORT_OUTPUT, # Add 'user data link' output port to node
-        c4d.DescID(c4d.DescLevel(c4d.ID_USERDATA, c4d.DTYPE_SUBCONTAINER, 0),c4d.DescLevel(1)), message=True)
-
-    # Modify object node B
-    objectNodeB[c4d.GV_OBJECT_OBJECT_ID] = dummyObject
-    objPortB = objectNodeB.AddPort(c4d.GV_PORT_OUTPUT, # Add 'user data link' output port to node
-        c4d.DescID(c4d.DescLevel(c4d.ID_USERDATA, c4d.DTYPE_SUBCONTAINER, 0),c4d.DescLevel(2)), message=True)
-
-    # Modify point nodes
-    pointNodeA[c4d.GV_POINT_USE_DEFORMED] = True
-    pointNodeB[c4d.GV_POINT_USE_DEFORMED] = True
-    pointNodeB.AddPort(c4d.GV_PORT_INPUT, 2002, c4d.GV_PORT_FLAG_IS_VISIBLE) # Add input point position port
-
-    # Connecting ports
-    objPortA.Connect(pyInPort)
-    objPortB.Connect(pointNodeB.GetInPort(0))
-
-    pyOutPortA.Connect(pointNodeA.GetInPort(0))
-    pyOutPortB.Connect(iterationNode.GetInPort(1))
-    iterationNode.GetOutPort(0).Connect(pointNodeA.GetInPort(1))
-    iterationNode.GetOutPort(0).Connect(pointNodeB.GetInPort(1))
-    pointNodeA.GetOutPort(1).Connect(pointNodeB.GetInPort(2))
-
-    c4d.modules.graphview.RedrawMaster(nodemaster) # Refresh xpresso
-    return dummyObject
+    bakeObject.SetName(obj.GetName()+"_baked") # Set name
+    doc.InsertObject(bakeObject) # Insert bakeObject to document
+    MoveToLast(bakeObject, doc) # Move new Object in the object hierarchy
+    return bakeObject
 
 def MoveToLast(obj, doc):
     items = doc.GetObjects() # Get top level items from the document
@@ -135,7 +113,7 @@ def CopyTags(source, target):
     hiddenTags = [c4d.PointTag, c4d.PolygonTag] # Tag types that you dont wan't to delete
     tags = source.GetTags() # Get objects tags
     for t in reversed(tags): # Iterate through tags
-        if type(t) not in hiddenTags:
+        if type(t) not in hiddenTags and not AR_Bake.IsBakeTag(t): # Bake data belongs to the source's own bake
             d = t.GetClone() # Duplicate the tag
             target.InsertTag(d) # Copy tag
 
@@ -150,30 +128,20 @@ def ResetPSR(op):
     op[c4d.ID_BASEOBJECT_REL_ROTATION,c4d.VECTOR_Y] = 0
     op[c4d.ID_BASEOBJECT_REL_ROTATION,c4d.VECTOR_Z] = 0
 
-def CreateUserDataLink(obj, name, link, parentGroup=None, shortname=None):
-    """ Create user data link """
+def CreateUserDataFilename(obj, name, path, parentGroup=None, shortname=None):
+    """ Create user data filename """
     if obj is None: return False # If there is no object stop the function
     if shortname is None: shortname = name # Short name is name
-    bc = c4d.GetCustomDatatypeDefault(c4d.DTYPE_BASELISTLINK) # Initialize user data
+    bc = c4d.GetCustomDatatypeDefault(c4d.DTYPE_FILENAME) # Initialize user data
     bc[c4d.DESC_NAME] = name # Set user data name
     bc[c4d.DESC_SHORT_NAME] = shortname # Set userdata short name
-    bc[c4d.DESC_DEFAULT] = link # Set default value
     bc[c4d.DESC_ANIMATE] = c4d.DESC_ANIMATE_OFF # Disable animation option
-    bc[c4d.DESC_SHADERLINKFLAG] = True
     if parentGroup is not None: # If there is parent group
         bc[c4d.DESC_PARENTGROUP] = parentGroup # Set parent group
     element = obj.AddUserData(bc) # Add user data
-    obj[element] = link # Set user data value
+    obj[element] = path # Set user data value
     return element # Return user data field
 
-def SetCurrentFrame(frame, doc):
-    """ Changes editor's current frame to  """
-
-    doc.SetTime(c4d.BaseTime(float(frame)/doc.GetFps())) # Set current time to given frame
-    doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
-    c4d.GeSyncMessage(c4d.EVMSG_TIMECHANGED) # Send a synchronous event message that time has changed
-    return
-
 def RemoveTags(obj):
     """ Removes tags of the object  """
     hiddenTags = [c4d.PointTag, c4d.PolygonTag] # Tag types that you dont wan't to delete
@@ -182,8 +150,46 @@ def RemoveTags(obj):
         if type(t) not in hiddenTags: # If not protected tag type
             t.Remove() # Remove tag
 
+def PointsChanged(points, reference, tolerance):
+    """ Checks if any point has moved more than tolerance from the reference """
+    if points == reference: # Quick check for identical points
+        return False
+    if tolerance == 0 or len(points) != len(reference): # If exact match is required or point count changed
+        return True
+    for p, r in zip(points, reference): # Iterate through points
+        d = p - r # Difference between points
+        if abs(d.x) > tolerance or abs(d.y) > tolerance or abs(d.z) > tolerance: # If point moved too much
+            return True
+    return False
+
+def GetDeformedPoints(obj):
+    """ Returns points of the evaluated object in world space, deformers and generators included. Returns None if the object doesn't evaluate to a single point object """
+    mg = obj.GetMg() # Get global matrix
+    if obj.GetType() not in [5100, 5101]: # If generator
+        cache = obj.GetCache() # Generated object
+        while cache is not None: # Generated object can be a generator too
+            if cache.GetDown() is not None or cache.GetNext() is not None: # If generator creates a hierarchy
+                return None # Baked object gets only the top object of Make Editable, points would not match
+            mg = mg * cache.GetMl() # Matrix of the generated object
+            obj = cache
+            cache = obj.GetCache()
+    if obj.GetDeformCache() is not None: # If object is deformed
+        obj = obj.GetDeformCache()
+    if not obj.CheckType(c4d.Opoint): # If there are no points
+        return None
+    return [mg * p for p in obj.GetAllPoints()]
+
+def AddPointKey(target, track, frame, points, doc):
+    """ Adds PLA keyframe with given points """
+    curve = track.GetCurve() # Get Curve of the CTrack
+    currentTime = c4d.BaseTime(frame, doc.GetFps()) # Get current time
+    key = curve.AddKey(currentTime)["key"]
+    target.SetAllPoints(points)
+    target.Message(c4d.MSG_UPDATE)
+    track.FillKey(doc, target, key)
+
 def Bake(source, target):
-    """ Bake function  """
+    """ Bakes point positions to PLA, only frames that differ from the last keyed frame are keyed. Returns False if baking is cancelled """
 
     doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
     fps = doc.GetFps() # Get Frame Rate
@@ -194,52 +200,209 @@ def Bake(source, target):
     PLAtrack = c4d.CTrack(target, desc) # Initialize a PLA track
     target.InsertTrackSorted(PLAtrack) # Insert PLA track to the object
 
-    curve = PLAtrack.GetCurve() # Get Curve of the CTrack
+    keyed = None # Points of the last keyed frame
+    heldFrame = None # Last frame that was skipped because points did not change
+    keyCount = 0 # Amount of written keyframes
 
     for i in range(startFrame, endFrame+1): # Iterate through Preview Range
-        SetCurrentFrame(i, doc) # Set current frame
+        if not AR_Bake.Progress(i, startFrame, endFrame): # If baking is cancelled
+            return False
+        AR_Bake.SetCurrentFrame(i, doc) # Set current frame
         frame = doc.GetTime().GetFrame(fps) # Get current frame
+        start = AR_Bake.timer() # Start profiling
+        points = GetDeformedPoints(source)
+        if points is None: # If object stops being a single point object
+            print("%s: object generates a hierarchy at frame %d, baking stops here" % (target.GetName(), frame))
+            break
+        if len(points) != target.GetPointCount(): # If point count changes, points can't be set to the baked object
+            print("%s: point count changed at frame %d, baking stops here" % (target.GetName(), frame))
+            break
+        changed = keyed is None or PointsChanged(points, keyed, pointTolerance) # Did mesh move
+        AR_Bake.Record("Sampling", start)
+        AR_Bake.RecordFrame(start)
+
+        if not changed: # If mesh did not move
+            heldFrame = frame # Frame is skipped
+            continue
+
+        start = AR_Bake.timer() # Start profiling
+        if heldFrame is not None: # If mesh starts to move after still frames
+            AddPointKey(target, PLAtrack, heldFrame, keyed, doc) # Hold key, so interpolation does not start too early
+            keyCount += 1
+            heldFrame = None
+
+        AddPointKey(target, PLAtrack, frame, points, doc)
+        keyCount += 1
+        keyed = points
+        AR_Bake.Record("Key writing", start)
+
+    frameCount = endFrame-startFrame+1 # Amount of baked frames
+    print("%s: %d frames -> %d keys (%d saved)" % (target.GetName(), frameCount, keyCount, frameCount-keyCount))
+    return True
+
+def GetCachePath(doc, name):
+    """ Returns a new point cache file path next to the document, existing caches can still be in use and are never overwritten """
+    folder = doc.GetDocumentPath() # Folder of the document
+    path = os.path.join(folder, name+"_baked.arpc") # Point cache file path
+    i = 1 # Running number for taken names
+    while os.path.exists(path): # If file already exists
+        path = os.path.join(folder, "%s_baked_%d.arpc" % (name, i))
+        i += 1
+    return path
+
+def BakeCache(source, target, path):
+    """ Streams point positions of every frame to a point cache file, only one frame is kept in memory. Returns False if baking is cancelled """
 
-        points = source.GetAllPoints()
-        
-        #key.SetValue(curve, value)
-        #key.SetGeData(curve, value) # Keyframe value needs to be set with SetGeData
-
-        currentTime = c4d.BaseTime(frame, fps) # Get current time
-        #points = source.GetAllPoints()
-        key = curve.AddKey(currentTime)["key"]
-
-        target.SetAllPoints(points)
-        target.Message(c4d.MSG_UPDATE)
-        PLAtrack.FillKey(doc, target, key)
-
+    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
+    fps = doc.GetFps() # Get Frame Rate
+    startFrame = doc.GetLoopMinTime().GetFrame(fps) # Get first frame of Preview Range
+    endFrame = doc.GetLoopMaxTime().GetFrame(fps) # Get last frame of Preview Range
+    pointCount = len(GetDeformedPoints(source)) # Point count is fixed for the whole cache
+    frameCount = 0 # Amount of written frames
+    cancelled = False # Is baking cancelled
+
+    try: # Try to create the cache file
+        f = open(path, 'wb')
+    except (IOError, OSError) as e: # If file can't be written
+        print("%s: can't write %s (%s)" % (target.GetName(), path, e))
+        return False
+    with f:
+        f.write(struct.pack(cacheHeader, b"ARPC", 1, pointCount, startFrame, 0, fps)) # Frame count is written when baking is done
+        for i in range(startFrame, endFrame+1): # Iterate through Preview Range
+            if not AR_Bake.Progress(i, startFrame, endFrame): # If baking is cancelled
+                cancelled = True
+                break
+            AR_Bake.SetCurrentFrame(i, doc) # Set current frame
+            start = AR_Bake.timer() # Start profiling
+            points = GetDeformedPoints(source)
+            AR_Bake.Record("Sampling", start)
+            AR_Bake.RecordFrame(start)
+            if points is None or len(points) != pointCount: # If object stops being a single point object or point count changes
+                print("%s: point count changed at frame %d, cache stops here" % (target.GetName(), i))
+                break
+            start = AR_Bake.timer() # Start profiling
+            data = array.array('f') # Initialize 32-bit float array
+            for p in points: # Iterate through points
+                data.extend((p.x, p.y, p.z))
+            if sys.byteorder == "big": # Cache is always little endian
+                data.byteswap()
+            data.tofile(f) # Write frame to file
+            frameCount += 1
+            AR_Bake.Record("Cache writing", start)
+        f.seek(0)
+        f.write(struct.pack(cacheHeader, b"ARPC", 1, pointCount, startFrame, frameCount, fps)) # Update header
+
+    if cancelled: # Partial cache file is not kept
+        os.remove(path)
+        return False
+    CacheReader(target, path) # Add reader to baked object
+    print("%s: %d frames written to %s" % (target.GetName(), frameCount, path))
+    return True
+
+def CacheReader(obj, path):
+    """ Adds a python tag that reads the current frame from the point cache file """
+    pythontag = c4d.BaseTag(c4d.Tpython) # Initialize python tag
+    pythontag.SetName(AR_Bake.cacheTagName) # Set name, sub-frame sampling of the other bake scripts ignores this tag
+    obj.InsertTag(pythontag) # Insert python tag to object
+    pythontag[c4d.TPYTHON_FRAME] = True # Set frame dependet to true
+    CreateUserDataFilename(pythontag, "Cache", path) # Create user data filename
+    pythontag[c4d.TPYTHON_CODE] = ( "import c4d\n"
+                                    "import os\n"
+                                    "import mmap\n"
+                                    "import struct\n"
+                                    "\n"
+                                    "cache = {} # Opened cache file\n"
+                                    "\n"
+                                    "def close():\n"
+                                    "\tif 'map' in cache:\n"
+                                    "\t\tcache['map'].close()\n"
+                                    "\tif 'file' in cache:\n"
+                                    "\t\tcache['file'].close()\n"
+                                    "\tcache.clear()\n"
+                                    "\n"
+                                    "def main():\n"
+                                    "\tpath = op[c4d.ID_USERDATA,1]\n"
+                                    "\ttry:\n"
+                                    "\t\tstat = os.stat(path)\n"
+                                    "\texcept OSError:\n"
+                                    "\t\tclose()\n"
+                                    "\t\treturn\n"
+                                    "\tstate = (path, stat.st_size, stat.st_mtime) # File is mapped again if it has changed\n"
+                                    "\tif cache.get('state') != state:\n"
+                                    "\t\tclose()\n"
+                                    "\t\ttry:\n"
+                                    "\t\t\tcache['file'] = open(path, 'rb')\n"
+                                    "\t\t\tcache['map'] = mmap.mmap(cache['file'].fileno(), 0, access=mmap.ACCESS_READ)\n"
+                                    "\t\t\tcache['header'] = struct.unpack_from('"+cacheHeader+"', cache['map'], 0)\n"
+                                    "\t\texcept (IOError, OSError, ValueError, struct.error):\n"
+                                    "\t\t\tclose()\n"
+                                    "\t\t\treturn\n"
+                                    "\t\tcache['state'] = state\n"
+                                    "\tmagic, version, pointCount, startFrame, frameCount, fps = cache['header']\n"
+                                    "\tif frameCount == 0 or stat.st_size < struct.calcsize('"+cacheHeader+"') + frameCount*pointCount*12: # If cache is empty or not complete\n"
+                                    "\t\treturn\n"
+                                    "\tobj = op.GetObject()\n"
+                                    "\tif obj.GetPointCount() != pointCount: # If cache is not for this object\n"
+                                    "\t\treturn\n"
+                                    "\tframe = doc.GetTime().GetFrame(doc.GetFps())\n"
+                                    "\tindex = min(max(frame-startFrame, 0), frameCount-1) # Hold first and last frame\n"
+                                    "\toffset = struct.calcsize('"+cacheHeader+"') + index*pointCount*12\n"
+                                    "\tv = struct.unpack_from('<%df' % (pointCount*3), cache['map'], offset) # Read only the current frame\n"
+                                    "\tobj.SetAllPoints([c4d.Vector(v[i], v[i+1], v[i+2]) for i in range(0, len(v), 3)])\n"
+                                    "\tobj.Message(c4d.MSG_UPDATE)") # Python tag script
 
 def main():
     """ The first function to run """
     doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
     selected = doc.GetActiveObjects(0) # Get selected objects
+    keyMod = GetKeyMod() # Get keymodifier
+    if keyMod == "Shift" and doc.GetDocumentPath() == "": # If cache file can't be written next to the document
+        c4d.gui.MessageDialog("Save the document before baking to point cache.")
+        return
+    currentTime = doc.GetTime() # Get current time
+    AR_Bake.Setup(headless=headless, progressStep=progressStep, profile=profile) # Shared pipeline uses the config above
+    total = AR_Bake.timer() # Start profiling
     doc.StartUndo() # Start recording undos
     bakedObjects = [] # Initialize a list for collecting baked objects
+    cacheFiles = [] # Initialize a list for collecting written cache files
     for s in selected: # Iterate through objects
-        dummyObject = DummyObject(s, doc) # Dummy object
-        bakeObj = dummyObject.GetClone() # Bake object
-        name = s.GetName() # Get object's name
-        bakeObj.SetName(name+"_baked") # Set baked object's name
-        bakeObj.InsertAfter(dummyObject) # Insert object to document
+        if GetDeformedPoints(s) is None: # If object can't be baked to a single point object
+            print("%s: generates a hierarchy or has no points, make it editable and connect it before baking" % s.GetName())
+            continue
+        start = AR_Bake.timer() # Start profiling
+        bakeObj = BakeObject(s, doc) # Bake object
         doc.AddUndo(c4d.UNDOTYPE_NEW, bakeObj) # Add undo command for creating a new object
         doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
-        RemoveTags(bakeObj) # Remove tags of the object
-        Bake(dummyObject, bakeObj) # Bake the object
+        bakedObjects.append(bakeObj)
+        AR_Bake.Record("Setup", start)
+        if keyMod == "Shift":
+            path = GetCachePath(doc, s.GetName()) # Point cache file path
+            completed = BakeCache(s, bakeObj, path) # Bake the object to point cache
+            if completed:
+                cacheFiles.append(path)
+        else:
+            completed = Bake(s, bakeObj) # Bake the object
+        if not completed: # If baking was cancelled, every object of this run is rolled back
+            for baked in bakedObjects:
+                doc.AddUndo(c4d.UNDOTYPE_DELETEOBJ, baked) # Add undo command for deleting an object
+                baked.Remove() # Delete baked object
+            for path in cacheFiles:
+                os.remove(path) # Delete cache file
+            bakedObjects = []
+            break
         CopyTags(s, bakeObj)
         DisableDynamics(bakeObj)
-        dummyObject.Remove() # Delete dummy object
-        bakedObjects.append(bakeObj)
         
     for baked in reversed(bakedObjects):
         MoveToFirst(baked, doc) # Sort
 
+    doc.SetTime(currentTime) # Restore current time
+    doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
+    c4d.StatusClear() # Clear status bar
     doc.EndUndo() # Stop recording undos
     c4d.EventAdd() # Refresh Cinema 4D
+    AR_Bake.Record("Total", total)
+    AR_Bake.Report("AR_BakeObjectPLA", doc)
 
 # Execute main()
 if __name__=='__main__':
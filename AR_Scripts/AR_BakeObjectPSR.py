@@ -10,8 +10,28 @@ Description-US: Bakes object to PSR animation in world space. SHIFT: In local sp
 Written for Maxon Cinema 4D R21.207
 Python version 2.7.14
 """
+# ----------------------------------------------------------------------------------------------------------------------------------------------
+keyTolerance = 0.01 # Maximum error allowed when reducing baked keyframes (degrees for rotations). Set to 0 to keep every key that changes the curve
+headless = True # If set true, interface is not updated while baking, which is faster. Progress is shown in the status bar, Esc cancels baking
+progressStep = 10 # Status bar is updated and Esc key is checked every n frames
+profile = False # If set true, time spent in every phase and frame is printed to the console and written as JSON file next to the document
+incremental = False # If set true, running the script again updates the earlier bake of the object and re-evaluates only frames that can have changed
+subFrameAngle = 0.0 # Sub-frame samples are added between frames where rotation changes more than this (degrees), e.g. 10. Set to 0 to disable
+subFrameDistance = 0.0 # Sub-frame samples are added between frames where position moves more than this (centimeters). Set to 0 to disable
+subFrameDepth = 2 # How many times a fast frame can be split in half, 2 gives quarter frame samples
+workers = 1 # Amount of worker threads, each one samples part of the preview range in a copy of the document. 1 bakes serially, set to 0 to use every CPU core. Scenes that depend on previous frames are always baked serially
+# ----------------------------------------------------------------------------------------------------------------------------------------------
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_Bake
+
+# Global variables
+dataVault = AR_Bake.psrVault # Baked channels: position, rotation and scale
 
 # Functions
 def GetKeyMod():
@@ -54,7 +74,7 @@ def CopyTags(source, target):
     hiddenTags = [c4d.PointTag, c4d.PolygonTag] # Tag types that you dont wan't to delete
     tags = source.GetTags() # Get objects tags
     for t in reversed(tags): # Iterate through tags
-        if type(t) not in hiddenTags:
+        if type(t) not in hiddenTags and not AR_Bake.IsBakeTag(t): # Bake data belongs to the source's own bake
             d = t.GetClone() # Duplicate the tag
             target.InsertTag(d) # Copy tag
 
@@ -64,78 +84,6 @@ def DisableDynamics(obj):
         if t.GetType() == 180000102: # If dynamics tag
             t[c4d.RIGID_BODY_ENABLED] = False # Disable dynamics
 
-def DummyObject(obj, doc):
-    dummyObject = obj.GetClone() # Initialize a camera object
-    RemoveTags(dummyObject)
-    dummyObject.SetName("Dummy "+obj.GetName()) # Set name
-    doc.InsertObject(dummyObject) # Insert dummyObject to document
-    MoveToLast(dummyObject, doc) # Move new camera in the object hierarchy
-    pythontag = c4d.BaseTag(c4d.Tpython) # Initialize python tag
-    dummyObject.InsertTag(pythontag) # Insert python tag to object
-    prioritydata = c4d.PriorityData() # Initialize a priority data
-    prioritydata.SetPriorityValue(c4d.PRIORITYVALUE_MODE, c4d.CYCLE_GENERATORS) # Set priority to 'Generators'
-    prioritydata.SetPriorityValue(c4d.PRIORITYVALUE_PRIORITY, 449) # Set priority value to last possible value
-    prioritydata.SetPriorityValue(c4d.PRIORITYVALUE_CAMERADEPENDENT, False) # Set camera dependent to false
-    pythontag[c4d.EXPRESSION_PRIORITY] = prioritydata # Set priority data
-    pythontag[c4d.TPYTHON_FRAME] = True # Set frame dependet to true
-    link1 = CreateUserDataLink(pythontag, "Object", obj) # Create user data link
-    pythontag[c4d.TPYTHON_CODE] = ( "import c4d\n"
-                                    "def main():\n"
-                                    "\tcam = op[c4d.ID_USERDATA,1]\n"
-                                    "\tmat = cam.GetMg()\n"
-                                    "\tobj = op.GetObject()\n"
-                                    "\tobj.SetMg(mat)")
-    return dummyObject
-
-def CleanKeys(obj):
-    """ Removes unnecessary keyframes """
-    ctracks = obj.GetCTracks() # Get object's CTracks
-    for ctrack in ctracks: # Iterate through CTracks
-        curve = ctrack.GetCurve() # Get Curve (keyframe holder)
-        keyCount = curve.GetKeyCount() # Get Keyframe count
-        keysToDelete = [] # Initialize an array for kayframes that can be deleted
-        for key in range(0, keyCount): # Iterate through keyframes
-            keyValue = curve.GetKey(key).GetValue() # Get keyframe value
-            if (key != 0) and (key != keyCount-1): # If not first or last keyframe
-                prevKey = curve.GetKey(key-1).GetValue() # Get previous keyframes value
-                nextKey = curve.GetKey(key+1).GetValue() # Get next keyframes value
-                if keyValue == prevKey and keyValue == nextKey: # If current keyframe has same value with previous and next keyframe
-                    keysToDelete.append(key) # Add this keyframe to deleted keys
-        for d in reversed(keysToDelete): # Iterate through keystoDelete array
-            curve.DelKey(d) # Delete keyframe
-    # Remove unused tracks
-    ctracks = obj.GetCTracks() # Get object's CTracks again
-    for ctrack in ctracks:
-        curve = ctrack.GetCurve()
-        keyCount = curve.GetKeyCount()
-        if keyCount == 2: # If CTrack has only two keyframes
-            if curve.GetKey(0).GetValue() == curve.GetKey(1).GetValue(): # ...and if they has same value
-                ctrack.Remove() # ...CTrack can be removed
-
-def CreateUserDataLink(obj, name, link, parentGroup=None, shortname=None):
-    """ Create user data link """
-    if obj is None: return False # If there is no object stop the function
-    if shortname is None: shortname = name # Short name is name
-    bc = c4d.GetCustomDatatypeDefault(c4d.DTYPE_BASELISTLINK) # Initialize user data
-    bc[c4d.DESC_NAME] = name # Set user data name
-    bc[c4d.DESC_SHORT_NAME] = shortname # Set userdata short name
-    bc[c4d.DESC_DEFAULT] = link # Set default value
-    bc[c4d.DESC_ANIMATE] = c4d.DESC_ANIMATE_OFF # Disable animation option
-    bc[c4d.DESC_SHADERLINKFLAG] = True
-    if parentGroup is not None: # If there is parent group
-        bc[c4d.DESC_PARENTGROUP] = parentGroup # Set parent group
-    element = obj.AddUserData(bc) # Add user data
-    obj[element] = link # Set user data value
-    return element # Return user data field
-
-def SetCurrentFrame(frame, doc):
-    """ Changes editor's current frame to  """
-
-    doc.SetTime(c4d.BaseTime(float(frame)/doc.GetFps())) # Set current time to given frame
-    doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
-    c4d.GeSyncMessage(c4d.EVMSG_TIMECHANGED) # Send a synchronous event message that time has changed
-    return
-
 def RemoveTags(obj):
     """ Removes tags of the object  """
     hiddenTags = [c4d.PointTag, c4d.PolygonTag] # Tag types that you dont wan't to delete
@@ -144,91 +92,91 @@ def RemoveTags(obj):
         if type(t) not in hiddenTags: # If not protected tag type
             t.Remove() # Remove tag
 
-def Bake(source, target):
-    """ Bake function  """
-
-    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
-    fps = doc.GetFps() # Get Frame Rate
-    startFrame = doc.GetLoopMinTime().GetFrame(fps) # Get first frame of Preview Range
-    endFrame = doc.GetLoopMaxTime().GetFrame(fps) # Get last frame of Preview Range
-
-    for i in range(startFrame, endFrame+1): # Iterate through Preview Range
-        SetCurrentFrame(i, doc) # Set current frame
-        frame = doc.GetTime().GetFrame(fps) # Get current frame
-
-        dataVault = [ [903, c4d.DTYPE_REAL, 1000, c4d.DTYPE_VECTOR], [903, c4d.DTYPE_REAL, 1001, c4d.DTYPE_VECTOR], [903, c4d.DTYPE_REAL, 1002, c4d.DTYPE_VECTOR], # Position
-                      [904, c4d.DTYPE_REAL, 1000, c4d.DTYPE_VECTOR], [904, c4d.DTYPE_REAL, 1001, c4d.DTYPE_VECTOR], [904, c4d.DTYPE_REAL, 1002, c4d.DTYPE_VECTOR], # Rotation
-                      [905, c4d.DTYPE_REAL, 1000, c4d.DTYPE_VECTOR], [905, c4d.DTYPE_REAL, 1001, c4d.DTYPE_VECTOR], [905, c4d.DTYPE_REAL, 1002, c4d.DTYPE_VECTOR],  # Scale
-                    ]
-
-        for data in dataVault: # Iterate through data vault
-            if len(data) == 2: # Float
-                desc = c4d.DescID(c4d.DescLevel(data[0], data[1],0))
-                value = source[data[0]]
-
-            if len(data) == 4: # Vector
-                desc = c4d.DescID(c4d.DescLevel(data[0], data[3],0), c4d.DescLevel(data[2], data[1],0))
-                value = source[data[0],data[2]]
-
-            track = target.FindCTrack(desc) # Try to find CTrack
-            if not track: # If CTrack does not exists
-                track = c4d.CTrack(target, desc) # Initialize CTrack
-                target.InsertTrackSorted(track) # Insert CTrack to the object
-
-            curve = track.GetCurve() # Get Curve of the CTrack
-            currentTime = c4d.BaseTime(frame, fps) # Get current time
-            key = curve.AddKey(currentTime)["key"]
-            track.FillKey(doc, target, key)
-
-            if data[1] == c4d.DTYPE_REAL: # Float
-                key.SetValue(curve, value)
-            else: # If boolean or integer
-                key.SetValue(curve, value)
-                key.SetGeData(curve, value) # Keyframe value needs to be set with SetGeData
+def Bake(sources, targets, mode):
+    """ Bakes PSR of every source to its target in one pass, returns False if baking is cancelled """
+    channels = [dataVault for s in sources] # Every PSR channel is baked
+    static = [[] for s in sources] # There are no static channels
+    return AR_Bake.Bake(sources, targets, channels, static, mode, mode == "World")
 
 def main():
     """ The first function to run """
     doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
     selected = doc.GetActiveObjects(0) # Get selected objects
+    currentTime = doc.GetTime() # Get current time
+    AR_Bake.Setup(keyTolerance=keyTolerance, headless=headless, progressStep=progressStep, profile=profile, incremental=incremental,
+                  subFrameAngle=subFrameAngle, subFrameDistance=subFrameDistance, subFrameDepth=subFrameDepth, workers=workers) # Shared pipeline uses the config above
+    total = AR_Bake.timer() # Start profiling
     doc.StartUndo() # Start recording undos
     keyMod = GetKeyMod() # Get keymodifier
     if keyMod == "None":
-        bakedObjects = [] # Initialize a list for collecting baked objects
+        targets = [] # Initialize a list for collecting new and earlier baked objects
+        bakedObjects = [] # Initialize a list for collecting new baked objects
+        start = AR_Bake.timer() # Start profiling
         for s in selected: # Iterate through objects
-            dummyObject = DummyObject(s, doc) # Dummy object
+            bakeObj = AR_Bake.FindBaked(s, "World", doc) if incremental else None # Earlier bake of the object
+            if bakeObj is not None: # If object is baked again
+                doc.AddUndo(c4d.UNDOTYPE_CHANGE, bakeObj) # Add undo command for changing an object
+                targets.append(bakeObj)
+                continue
             bakeObj = s.GetClone() # Bake object
             name = s.GetName() # Get object's name
             bakeObj.SetName(name+"_baked") # Set baked object's name
-            bakeObj.InsertAfter(dummyObject) # Insert object to document
+            bakeObj.SetFrozenPos(c4d.Vector(0)) # Reset frozen transformation, so PSR is the global matrix
+            bakeObj.SetFrozenRot(c4d.Vector(0))
+            bakeObj.SetFrozenScale(c4d.Vector(1))
+            doc.InsertObject(bakeObj) # Insert object to document
             doc.AddUndo(c4d.UNDOTYPE_NEW, bakeObj) # Add undo command for creating a new object
-            doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
             RemoveTags(bakeObj) # Remove tags of the object
-            Bake(dummyObject, bakeObj) # Bake the object
-            CleanKeys(bakeObj) # Clean keyframes
-            CopyTags(s, bakeObj)
-            DisableDynamics(bakeObj)
-            dummyObject.Remove() # Delete dummy object
+            targets.append(bakeObj)
             bakedObjects.append(bakeObj)
 
-        for baked in reversed(bakedObjects):
-            MoveToFirst(baked, doc) # Sort
+        doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
+        AR_Bake.Record("Setup", start)
+        if Bake(selected, targets, "World"): # Bake all objects in one pass
+            for s, bakeObj in zip(selected, targets):
+                if bakeObj in bakedObjects: # If new baked object
+                    CopyTags(s, bakeObj)
+                    DisableDynamics(bakeObj)
+
+            for baked in reversed(bakedObjects):
+                MoveToFirst(baked, doc) # Sort
+        else: # If baking was cancelled
+            AR_Bake.Rollback(bakedObjects, doc)
 
     if keyMod == "Shift":
+        targets = [] # Initialize a list for collecting new and earlier baked objects
+        bakedObjects = [] # Initialize a list for collecting new baked objects
         for s in selected: # Iterate through objects
+            bakeObj = AR_Bake.FindBaked(s, "Local", doc) if incremental else None # Earlier bake of the object
+            if bakeObj is not None: # If object is baked again
+                doc.AddUndo(c4d.UNDOTYPE_CHANGE, bakeObj) # Add undo command for changing an object
+                targets.append(bakeObj)
+                continue
             bakeObj = s.GetClone() # Bake object
             name = s.GetName() # Get object's name
             bakeObj.SetName(name+"_baked") # Set baked object's name
             bakeObj.InsertAfter(s) # Insert object to document
             doc.AddUndo(c4d.UNDOTYPE_NEW, bakeObj) # Add undo command for creating a new object
-            doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
             RemoveTags(bakeObj) # Remove tags of the object
-            Bake(s, bakeObj) # Bake the object
-            CleanKeys(bakeObj) # Clean keyframes
-            CopyTags(s, bakeObj)
-            DisableDynamics(bakeObj)
+            targets.append(bakeObj)
+            bakedObjects.append(bakeObj)
 
+        doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
+        if Bake(selected, targets, "Local"): # Bake all objects in one pass
+            for s, bakeObj in zip(selected, targets):
+                if bakeObj in bakedObjects: # If new baked object
+                    CopyTags(s, bakeObj)
+                    DisableDynamics(bakeObj)
+        else: # If baking was cancelled
+            AR_Bake.Rollback(bakedObjects, doc)
+
+    doc.SetTime(currentTime) # Restore current time
+    doc.ExecutePasses(None, True, True, True, 0) # Animate the current frame of the document
+    c4d.StatusClear() # Clear status bar
     doc.EndUndo() # Stop recording undos
     c4d.EventAdd() # Refresh Cinema 4D
+    AR_Bake.Record("Total", total)
+    AR_Bake.Report("AR_BakeObjectPSR", doc)
 
 # Execute main()
 if __name__=='__main__':
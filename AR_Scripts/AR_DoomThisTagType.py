@@ -14,36 +14,21 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
-
-def IterateHierarchy(op, theTag, sel):
-    if op is None:
-        return
-    while op:
+def RemoveTagType(tags, theTag, sel):
+    for op, t in tags.Get(theTag.GetType()): # Iterate through tags of the same type
         if sel == True:
-            if op.GetBit(c4d.BIT_ACTIVE) == 1: # If object is active
-                tags = op.GetTags() # Get tags of object
-                for t in tags: # Loop Through tags
-                    if t.GetType() == theTag.GetType():
-                        doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
-                        t.Remove() # Remove tag
-            op = GetNextObject(op)
-        elif sel == False:
-            tags = op.GetTags() # Get tags of object
-            for t in tags: # Loop Through tags
-                if t.GetType() == theTag.GetType():
-                    doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
-                    t.Remove() # Remove tag
-            op = GetNextObject(op)
+            if op.GetBit(c4d.BIT_ACTIVE) != 1: # If object is not active
+                continue
+        doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
+        t.Remove() # Remove tag
     return True
 
 def main():
@@ -61,8 +46,9 @@ def main():
         for s in selection : # Loop through selection
             if type(s) in commonTags: # If selected item is a tag
                 theTag = s # Selected tag type is doomed
-        start_object = doc.GetFirstObject() # Get first object
-        IterateHierarchy(start_object, theTag, sel) # Do the thing
+        tags = AR_SceneIndex.GetTags(doc) # Tags by type, objects come from the cached hierarchy
+        RemoveTagType(tags, theTag, sel) # Do the thing
+        AR_SceneIndex.TagsRemoved(doc) # Removed tags are dropped from the cached tag index
     except: # If something went wrong
         pass # Do nothing
     doc.EndUndo() # Stop recording undos
@@ -16,7 +16,12 @@ Change log:
 # Libraries
 import c4d
 import os
+import sys
 import csv
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
 def GetKeyMod():
@@ -45,20 +50,12 @@ def GetKeyMod():
             keyMod = 'None'
         return keyMod
 
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
+def HasTracks(op):
+    return op.GetFirstCTrack() is not None # If object has animation tracks
 
 def IterateHierarchy():
-    op = doc.GetFirstObject()
-    while op is not None:
+    for op, depth in AR_SceneIndex.Walk(doc.GetFirstObject(), HasTracks): # Iterate through animated objects
         yield op
-        op = GetNextObject(op)
 
 def IterateTracks():
     for op in IterateHierarchy():
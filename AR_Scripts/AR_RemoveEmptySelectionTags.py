@@ -12,52 +12,38 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
- 
-def RemoveEmptySelectionTag(op, selection):
+def RemoveEmptySelectionTag(tags, selection):
     selectionTags = [5673, # Polygon selection
                      5674, # Point selection
                      5701] # Edge selection
 
-    if op is None:
-        return
-    while op:
-        tags = op.GetTags() # Get tags of object
+    for op, t in tags.Get(selectionTags): # Iterate through selection tags
         if selection:
-            if op.GetBit(c4d.BIT_ACTIVE) == 1: # If object is active
-                for t in tags: # Iterate through tags
-                    if t.GetType() in selectionTags: # If tag is a selection tag
-                        baseSelect = t.GetBaseSelect() # Get base select
-                        if baseSelect.GetCount() == 0: # If empty selection tag
-                            doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Record undo
-                            t.Remove() # Delete tag
-        else:
-            for t in tags: # Iterate through tags
-                if t.GetType() in selectionTags: # If tag is a selection tag
-                    baseSelect = t.GetBaseSelect() # Get base select
-                    if baseSelect.GetCount() == 0: # If empty selection tag
-                        doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Record undo
-                        t.Remove() # Delete tag
-        op = GetNextObject(op)
+            if op.GetBit(c4d.BIT_ACTIVE) != 1: # If object is not active
+                continue
+        baseSelect = t.GetBaseSelect() # Get base select
+        if baseSelect.GetCount() == 0: # If empty selection tag
+            doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Record undo
+            t.Remove() # Delete tag
     return True
 
 def main():
     doc.StartUndo() # Start recording undos
     selection = doc.GetActiveObjects(0) # Get selected objects
-    start_object = doc.GetFirstObject() # Get first object
+    tags = AR_SceneIndex.GetTags(doc) # Tags by type, objects come from the cached hierarchy
     if len(selection) != 0:
-        RemoveEmptySelectionTag(start_object, True)
+        RemoveEmptySelectionTag(tags, True)
     else:
-        RemoveEmptySelectionTag(start_object, False)
+        RemoveEmptySelectionTag(tags, False)
+    AR_SceneIndex.TagsRemoved(doc) # Removed tags are dropped from the cached tag index
     doc.EndUndo() # Stop recording undos
     c4d.EventAdd() # Refresh Cinema 4D
 
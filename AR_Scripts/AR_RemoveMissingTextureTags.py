@@ -12,6 +12,12 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
 def GetKeyMod():
@@ -40,67 +46,30 @@ def GetKeyMod():
             keyMod = 'None'
         return keyMod
 
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
- 
-def RemoveMissingTextureTags(op, selection):
-    if op is None:
-        return
-    while op:
-        tags = op.GetTags() # Get tags of object
+def RemoveMissingTextureTags(tags, selection):
+    for op, t in tags.Get(5616): # Iterate through texture tags
         if selection == True:
-            if op.GetBit(c4d.BIT_ACTIVE) == 1: # If object is active
-                for t in tags: # Loop Through tags
-                    if t.GetType() == 5616: # If tag is texture tag
-                        if t[c4d.TEXTURETAG_MATERIAL] == None: # If tag doesn't have material
-                            doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
-                            t.Remove() # Remove tag
-        else:
-            for t in tags: # Loop Through tags
-                if t.GetType() == 5616: # If tag is texture tag
-                    if t[c4d.TEXTURETAG_MATERIAL] == None: # If tag doesn't have material
-                        doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
-                        t.Remove() # Remove tag
-        op = GetNextObject(op)
+            if op.GetBit(c4d.BIT_ACTIVE) != 1: # If object is not active
+                continue
+        if t[c4d.TEXTURETAG_MATERIAL] == None: # If tag doesn't have material
+            doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
+            t.Remove() # Remove tag
     return True
 
-def RemoveTagsWithMissingSelection(op, selection):
-    if op is None:
-        return
-    while op:
-        materialTags = [] # Init an array
-        selectionTags = [] # Init an array
-        tags = op.GetTags() # Get object's tags
-        
-        for t in tags: # Collect tags
-            if t.GetType() == 5616: # If material tag
-                materialTags.append(t)
-            if t.GetType() == 5673: # Polygon selection tag
-                selectionTags.append(t.GetName())
-        
+def RemoveTagsWithMissingSelection(tags, selection):
+    selectionTags = {} # Names of polygon selection tags by object's GUID
+    for op, t in tags.Get(5673): # Polygon selection tags
+        selectionTags.setdefault(op.GetGUID(), []).append(t.GetName())
+
+    for op, m in tags.Get(5616): # Iterate through material tags
         if selection == True:
-            if op.GetBit(c4d.BIT_ACTIVE) == 1: # If object is active
-                for m in materialTags: # Iterate through material tags
-                    restriction = m[c4d.TEXTURETAG_RESTRICTION] # Get polygon restriction
-                    if restriction not in selectionTags: # If not found in polygon selection tags
-                        if restriction != "":
-                            doc.AddUndo(c4d.UNDO_DELETE, m)
-                            m.Remove() # Remove tag
-        else:
-            for m in materialTags: # Iterate through material tags
-                restriction = m[c4d.TEXTURETAG_RESTRICTION] # Get polygon restriction
-                if restriction not in selectionTags: # If not found in polygon selection tags
-                    if restriction != "":
-                        doc.AddUndo(c4d.UNDO_DELETE, m)
-                        m.Remove() # Remove tag
-        
-        op = GetNextObject(op)
+            if op.GetBit(c4d.BIT_ACTIVE) != 1: # If object is not active
+                continue
+        restriction = m[c4d.TEXTURETAG_RESTRICTION] # Get polygon restriction
+        if restriction not in selectionTags.get(op.GetGUID(), []): # If not found in polygon selection tags
+            if restriction != "":
+                doc.AddUndo(c4d.UNDOTYPE_DELETE, m)
+                m.Remove() # Remove tag
     return True
 
 def main():
@@ -109,17 +78,18 @@ def main():
     selection = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_CHILDREN) # Get active selection
     keyMod = GetKeyMod() # Get keymodifier
     try: # Try to execute following script
-        start_object = doc.GetFirstObject() # Get first object
+        tags = AR_SceneIndex.GetTags(doc) # Tags by type, objects come from the cached hierarchy
         if keyMod == "None":
             if len(selection) != 0:
-                RemoveMissingTextureTags(start_object, True) # Do the thing
+                RemoveMissingTextureTags(tags, True) # Do the thing
             else:
-                RemoveMissingTextureTags(start_object, False) # Do the thing
+                RemoveMissingTextureTags(tags, False) # Do the thing
         elif keyMod == "Shift":
             if len(selection) != 0:
-                RemoveTagsWithMissingSelection(start_object, True) # Do the other thing
+                RemoveTagsWithMissingSelection(tags, True) # Do the other thing
             else:
-                RemoveTagsWithMissingSelection(start_object, False) # Do the other thing
+                RemoveTagsWithMissingSelection(tags, False) # Do the other thing
+        AR_SceneIndex.TagsRemoved(doc) # Removed tags are dropped from the cached tag index
     except: # If something went wrong
         pass # Do nothing
     doc.EndUndo() # Stop recording undos
@@ -12,36 +12,22 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
- 
-def RemoveTags(op, selection):
-    if op is None:
-        return
-    while op:
-        tags = op.GetTags() # Get tags of object
+def RemoveTags(tags, selection):
+    hiddenTags = [c4d.Tpoint, c4d.Tpolygon] # Tag types that you dont wan't to delete
+    for op, t in tags.Get([x for x in tags.tags if x not in hiddenTags]): # Iterate through tags that are not protected
         if selection:
-            if op.GetBit(c4d.BIT_ACTIVE) == 1: # If object is active
-                hiddenTags = [c4d.PointTag, c4d.PolygonTag] # Tag types that you dont wan't to delete
-                for t in tags: # Loop Through tags
-                    if type(t) not in hiddenTags: # If not protected tag type
-                        doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
-                        t.Remove() # Remove tag
-        else:
-            hiddenTags = [c4d.PointTag, c4d.PolygonTag] # Tag types that you dont wan't to delete
-            for t in tags: # Loop Through tags
-                if type(t) not in hiddenTags: # If not protected tag type
-                    doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
-                    t.Remove() # Remove tag
-        op = GetNextObject(op)
+            if op.GetBit(c4d.BIT_ACTIVE) != 1: # If object is not active
+                continue
+        doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
+        t.Remove() # Remove tag
     return True
 
 def main():
@@ -49,11 +35,12 @@ def main():
     doc.StartUndo() # Start recording undos
     selection = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_CHILDREN) # Get active selection
     try: # Try to execute following script
-        start_object = doc.GetFirstObject() # Get first object
+        tags = AR_SceneIndex.GetTags(doc) # Tags by type, objects come from the cached hierarchy
         if len(selection) != 0:
-            RemoveTags(start_object, True) # Do the thing
+            RemoveTags(tags, True) # Do the thing
         else:
-            RemoveTags(start_object, False) # Do the thing
+            RemoveTags(tags, False) # Do the thing
+        AR_SceneIndex.TagsRemoved(doc) # Removed tags are dropped from the cached tag index
     except: # If something went wrong
         pass # Do nothing
     doc.EndUndo() # Stop recording undos
@@ -12,40 +12,25 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
- 
-def RemoveAll(op):
-    if op is None:
-        return
-    while op:
-        tags = op.GetTags() # Get tags of object
-        for t in tags: # Loop Through tags
-            if t.GetType() == 5616: # If tag is texture tag
-                doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
-                t.Remove() # Remove tag
-        op = GetNextObject(op)
+def RemoveAll(tags):
+    for op, t in tags.Get(5616): # Iterate through texture tags
+        doc.AddUndo(c4d.UNDOTYPE_DELETE, t) # Add undo command for removing tag
+        t.Remove() # Remove tag
     return True
 
-def RemoveSelected(op):
-    if op is None:
-        return
-    while op:
+def RemoveSelected(tags):
+    for op, t in tags.Get(5616):
         if op.GetBit(c4d.BIT_ACTIVE) == True: # If object is selected
-            tags = op.GetTags()
-            for t in tags:
-                if t.GetType() == 5616:
-                    doc.AddUndo(c4d.UNDOTYPE_DELETE, t)
-                    t.Remove()
-        op = GetNextObject(op)
+            doc.AddUndo(c4d.UNDOTYPE_DELETE, t)
+            t.Remove()
     return True
 
 def main():
@@ -53,11 +38,12 @@ def main():
     doc.StartUndo() # Start recording undos
     try: # Try to execute following script
         selection = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_0) # Get object selection
-        start_object = doc.GetFirstObject() # Get first object
+        tags = AR_SceneIndex.GetTags(doc) # Tags by type, objects come from the cached hierarchy
         if selection == []: # If there is no selected objects        
-            RemoveAll(start_object) # Do the thing
+            RemoveAll(tags) # Do the thing
         else:
-            RemoveSelected(start_object) # Do the thing
+            RemoveSelected(tags) # Do the thing
+        AR_SceneIndex.TagsRemoved(doc) # Removed tags are dropped from the cached tag index
     except: # If something went wrong
         pass # Do nothing
     doc.EndUndo() # Stop recording undos
@@ -0,0 +1,641 @@
+"""
+AR_SceneIndex
+
+Author: Arttu Rautio (aturtur)
+Website: http://aturtur.com/
+Name-US: AR_SceneIndex
+Version: 1.0
+Description-US: Shared scene index and selection helper that other AR_Scripts import. Running it prints statistics of the active document's index.
+
+Written for Maxon Cinema 4D R21.207
+Python version 2.7.14
+"""
+# Libraries
+import c4d
+import array
+import bisect
+import fnmatch
+import math
+import re
+
+# Global variables
+cache = [] # Indexes of recently used documents, kept between script runs: [document, dirty key, {name: [key, index]}]
+maxDocuments = 4 # Amount of documents that are kept in the cache
+building = 0 # Depth of index builds that are running, nested builds don't check the document again
+colorStep = 1.0/32 # Size of a display color bucket, colors are compared exactly only inside nearby buckets
+
+# Object type families, objects that have enable switch (ID_BASEOBJECT_GENERATOR_FLAG)
+deformers = frozenset([431000028, #Bevel 0
+                       5149, #Wind 0
+                       1019768, #Morph 0
+                       5146, #Formula 0
+                       1018685, #Displacer 0
+                       1019221, #Spline Wrap 0
+                       1008796, #Spline Rail 0
+                       1008982, #Spline 0
+                       5143, #Wrap 0
+                       1024552, #Surface 0
+                       1024529, #Smoothing 0
+                       1001003, #Spherify 0
+                       1019774, #Shrink Wrap 0
+                       1024544, #Collision 0
+                       1021280, #Squash & Stretch 0
+                       1021284, #Jiggle 0
+                       5148, #Shatter 0
+                       5147, #Melt 0
+                       1002603, #Explosion FX 0
+                       5145, #Explosion 0
+                       1024543, #Mesh 0
+                       5108, #FFD 0
+                       1024542, #Correction 0
+                       1024476, #Camera 0
+                       5134, #Twist 0
+                       5133, #Taper 0
+                       5131, #Shear 0
+                       5129, #Bulge 0
+                       5128]) #Bend 0
+
+primitives = frozenset([1027657, #Guide 0
+                        5120, #Bezier 0
+                        5169, #Landscape 0
+                        5166, #Figure 0
+                        5161, #Platonic 0
+                        5167, #Pyramid 0
+                        5165, #Tube 0
+                        5172, #Oil Tank 0
+                        5171, #Capsule 0
+                        5163, #Torus 0
+                        5160, #Sphere 0
+                        5174, #Polygon 0
+                        5168, #Plane 0
+                        5164, #Disc 0
+                        5170, #Cylinder 0
+                        5162, #Cone 0
+                        5159]) #Cube 0
+
+splines = frozenset([5188, #Cogwheel 0
+                     5186, #Rectangle 0
+                     5175, #Profile 0
+                     5183, #Cissoid 0
+                     5179, #n-Side 0
+                     5176, #Flower 0
+                     5180, #4-Side 0
+                     5185, #Helix 0
+                     5177, #Formula 0
+                     5178, #Text 0
+                     5181, #Circle 0
+                     5184, #Cycloid 0
+                     5187, #Star 0
+                     5182, #Arc 0
+                     5101]) #Spline 0
+
+generators = frozenset([5142, #Symmetry 0
+                        1001002, #Atom Array 1
+                        5125, #Metaball 1
+                        5150, #Array 1
+                        465002101, #Polygon Reduction 1
+                        5126, #LOD Instance 1
+                        431000174, #LOD 1
+                        1011010, #Connect 1
+                        100004007, #Cloth Surface 1
+                        1023866, #Python Generator 0
+                        1010865, #Boole 1
+                        1007455, #Subdivision Surface
+                        5118, #Sweep 1
+                        5107, #Loft 1
+                        5189, #Vectorizer 0
+                        5117, #Lathe 1
+                        1019396, #Spline Mask 1
+                        5116]) #Extrude 1
+
+moGenerators = frozenset([1018957, #MoInstance 1
+                          1019268, #MoText 0
+                          440000054, #MoSpline 0
+                          1018655, #Tracer 0
+                          1018791, #Fracture
+                          1036557, #Voronoi Fracture 1
+                          1018545, #Matrix 0
+                          1018544]) #Cloner 1
+
+effectors = frozenset([1019351, #Group 0
+                       1021287, #Volume 0
+                       1018935, #Time 0
+                       1018889, #Target 0
+                       1018881, #Step 0
+                       1018774, #Spline 0
+                       440000255, #Sound 0
+                       1018561, #Shader 0
+                       440000234, #ReEffector 0
+                       1018643, #Random 0
+                       1025800, #Python 0
+                       440000219, #Push Apart 0
+                       1018775, #Inheritance 0
+                       1018883, #Formula 0
+                       1019234, #Delay 0
+                       1021337, #Plain 0
+                       1019222, #PolyFX 0
+                       1019358]) #MoExtrude 0
+
+fields = frozenset([440000277,   #Python Field 0
+                    440000268, #Cylinder Field 0
+                    440000280, #Formula Field 0
+                    1040449,   #Group Field 0
+                    440000267, #Box Field 0
+                    440000283, #Sound Field 0
+                    440000272, #Torus Field 0
+                    440000243, #Spherical Field 0
+                    440000282, #Shader Field 0
+                    440000274, #Capsule Field 0
+                    1040448,   #Radial Field 0
+                    440000281, #Random Field 0
+                    440000269, #Cone Field 0
+                    440000266]) #Linear Field 0
+
+others = frozenset([5102, #Light 0
+                    1011196, #Cloud 1
+                    1011194, #Cloud Group 0
+                    1011146, #Physical Sky 0
+                    1039862, #Vector Smooth 0
+                    1039862, #Fog Smooth 0
+                    1039862, #SDF Smooth 0
+                    1039861, #Volume Mesher 1
+                    1039859, #Volume Builder 1
+                    1025766, #XRef 0
+                    1021824, #CMotion 0
+                    1021433, #Character 0
+                    1021283, #Cluster 0
+                    1026352, #MSkin 0
+                    1026224, #Muscle 0
+                    1019363, #Skin 0
+                    5136])    #Stage
+
+defaultGenerators = generators | moGenerators # Generators that are usually toggled
+allGenerators = deformers | primitives | splines | generators | moGenerators | effectors | fields | others
+
+# Parameters that link objects, by type ID of the object that has the link
+effectorLists = { # MoGraph generators: [(effector list parameter, name of the list)]
+    1018544:   [(c4d.ID_MG_MOTIONGENERATOR_EFFECTORLIST, "")], # Cloner
+    1018545:   [(c4d.ID_MG_MOTIONGENERATOR_EFFECTORLIST, "")], # Matrix
+    1018791:   [(c4d.ID_MG_MOTIONGENERATOR_EFFECTORLIST, "")], # Fracture
+    1018957:   [(c4d.ID_MG_MOTIONGENERATOR_EFFECTORLIST, "")], # MoInstance
+    1019358:   [(c4d.ID_MG_MOTIONGENERATOR_EFFECTORLIST, "")], # MoExtrude
+    1019222:   [(c4d.ID_MG_MOTIONGENERATOR_EFFECTORLIST, "")], # PolyFX
+    440000054: [(c4d.MGMOSPLINEOBJECT_EFFECTORLIST, "")], # MoSpline
+    1036557:   [(c4d.ID_MG_VF_MOTIONGENERATOR_EFFECTORLIST, "")], # Voronoi Fracture
+    1019268:   [(c4d.MGTEXTOBJECT_EFFECTORLIST_ALL, "All"), # MoText
+                (c4d.MGTEXTOBJECT_EFFECTORLIST_LINE, "Lines"),
+                (c4d.MGTEXTOBJECT_EFFECTORLIST_WORD, "Words"),
+                (c4d.MGTEXTOBJECT_EFFECTORLIST_CHAR, "Letters")]
+}
+sourceLinks = { # Objects that use a source object: (link parameter, mode parameter, mode value), mode is None if the link is always used
+    5126:      (c4d.INSTANCEOBJECT_LINK, None, None), # Instance
+    1011010:   (c4d.CONNECTOBJECT_LINK, None, None), # Connect
+    1018957:   (c4d.MGINSTANCER_LINK, None, None), # MoInstance
+    1018544:   (c4d.MG_OBJECT_LINK, c4d.ID_MG_MOTIONGENERATOR_MODE, 0), # Cloner in object mode
+    1018545:   (c4d.MG_OBJECT_LINK, c4d.ID_MG_MOTIONGENERATOR_MODE, 0), # Matrix in object mode
+    440000054: (c4d.MGMOSPLINEOBJECT_SOURCE_SPLINE, c4d.MGMOSPLINEOBJECT_MODE, 1) # MoSpline in spline mode
+}
+
+# Classes
+class Hierarchy(object):
+    """ Objects of the document in Object Manager order (preorder) with parent, depth and subtree end of every object """
+    def __init__(self, doc):
+        self.objects = [] # Objects in Object Manager order
+        self.parent = array.array('l') # Index of the parent, -1 for top level objects
+        self.depth = array.array('l') # How deep the object is in the hierarchy, top level objects are 0
+        self.end = array.array('l') # Index after the last descendant, descendants of i are objects[i+1:end[i]]
+        self.index = {} # Indices of the objects by GUID, copies of an object can share the GUID
+        self.levels = [] # Indices of the objects by depth, every level is in Object Manager order
+        self.maxDepth = array.array('l') # Depth of the deepest object in the subtree
+        self.Build(doc)
+
+    def Build(self, doc):
+        """ Walks the Object Manager once """
+        stack = [] # Indices of parents whose subtrees are not finished
+        obj = doc.GetFirstObject() # Get first object
+        while obj: # Iterate through every object
+            i = len(self.objects) # Index of the object
+            self.objects.append(obj)
+            self.parent.append(stack[-1] if stack else -1)
+            self.depth.append(len(stack))
+            self.end.append(i+1)
+            self.index.setdefault(obj.GetGUID(), []).append(i)
+            if len(self.levels) == len(stack): # If object is the first one of its level
+                self.levels.append(array.array('l'))
+            self.levels[len(stack)].append(i)
+            if obj.GetDown(): # If object has children
+                stack.append(i)
+                obj = obj.GetDown()
+                continue
+            while not obj.GetNext() and stack: # Close every subtree that ends here
+                self.end[stack.pop()] = len(self.objects)
+                obj = obj.GetUp()
+            obj = obj.GetNext()
+
+        self.maxDepth = array.array('l', self.depth) # Post-order pass, children are after their parent
+        for i in reversed(range(len(self.objects))): # Iterate from the last object
+            p = self.parent[i]
+            if p != -1 and self.maxDepth[i] > self.maxDepth[p]: # If the deepest object of the parent is in this subtree
+                self.maxDepth[p] = self.maxDepth[i]
+
+    def Find(self, obj):
+        """ Returns index of the object, None if the object is not in the index """
+        for i in self.index.get(obj.GetGUID(), []): # Iterate through objects that have the same GUID
+            if self.objects[i] == obj: # If object is the indexed one
+                return i
+        return None
+
+    def Descendants(self, i):
+        """ Returns every descendant of the object at index i in Object Manager order """
+        return self.objects[i+1:self.end[i]]
+
+    def Deepest(self, i):
+        """ Returns the deepest objects in the subtree of the object at index i, the object itself if it has no children """
+        level = self.levels[self.maxDepth[i]] # Objects at the deepest depth
+        first = bisect.bisect_left(level, i) # Subtree is a contiguous range of the level
+        last = bisect.bisect_left(level, self.end[i])
+        return [self.objects[k] for k in level[first:last]]
+
+    def DescendantsAt(self, i, level, deeper=False):
+        """ Returns descendants of the object at index i that are level steps deeper, or deeper than that """
+        target = self.depth[i] + level # Absolute depth
+        if deeper: # Descendants are always at least one step deeper
+            target = max(target, self.depth[i] + 1)
+        elif level < 1: # Object itself or its ancestors are not descendants
+            return []
+        if target > self.maxDepth[i]: # If subtree doesn't reach the level
+            return []
+        last = self.maxDepth[i] if deeper else target # Deepest level to collect
+        found = [] # Indices of found objects
+        for depth in range(target, last+1): # Iterate through levels, subtree is a contiguous range of every level
+            indices = self.levels[depth]
+            found.extend(indices[bisect.bisect_left(indices, i):bisect.bisect_left(indices, self.end[i])])
+        if deeper: # Objects of many levels, back to Object Manager order
+            found.sort()
+        return [self.objects[k] for k in found]
+
+class Types(object):
+    """ Objects of the document grouped by type ID """
+    def __init__(self, doc):
+        hierarchy = GetHierarchy(doc) # Types are collected from the hierarchy index
+        self.objects = hierarchy.objects # Objects in Object Manager order
+        self.indices = {} # Indices of the objects by type ID
+        for i, obj in enumerate(self.objects): # Iterate through every object
+            self.indices.setdefault(obj.GetType(), array.array('l')).append(i)
+
+    def Indices(self, types):
+        """ Returns hierarchy indices of the objects of the type ID or collection of type IDs in Object Manager order """
+        if isinstance(types, int): # If single type ID
+            return list(self.indices.get(types, []))
+        found = [self.indices[t] for t in types if t in self.indices] # Index arrays of the found types
+        if len(found) == 1: # Objects of one type are already in order
+            return list(found[0])
+        return sorted(i for indices in found for i in indices)
+
+    def Get(self, types):
+        """ Returns objects of the type ID or collection of type IDs (e.g. a family) in Object Manager order """
+        return [self.objects[i] for i in self.Indices(types)]
+
+    def Count(self, types):
+        """ Returns amount of objects of the type ID or collection of type IDs """
+        if isinstance(types, int): # If single type ID
+            types = [types]
+        return sum(len(self.indices.get(t, [])) for t in set(types))
+
+class Tags(object):
+    """ Tags of the document grouped by tag type ID """
+    def __init__(self, doc):
+        hierarchy = GetHierarchy(doc) # Tags are collected from the objects of the hierarchy index
+        self.tags = {} # Tags by tag type ID, in Object Manager order
+        for obj in hierarchy.objects: # Iterate through every object
+            for tag in obj.GetTags(): # Iterate through tags of the object
+                self.tags.setdefault(tag.GetType(), []).append(tag)
+
+    def Get(self, types):
+        """ Returns (object, tag) pairs of the tag type ID or collection of tag type IDs, removed tags are skipped and the object is read from the tag """
+        if isinstance(types, int): # If single type ID
+            types = [types]
+        found = []
+        for t in set(types): # Iterate through tag types
+            for tag in self.tags.get(t, []): # Iterate through tags of the type
+                obj = tag.GetObject() if tag.IsAlive() else None # Current owner of the tag
+                if obj is not None: # If tag is not removed
+                    found.append((obj, tag))
+        return found
+
+    def Prune(self):
+        """ Removes tags that don't belong to an object anymore """
+        for t in list(self.tags): # Iterate through tag types
+            self.tags[t] = [tag for tag in self.tags[t] if tag.IsAlive() and tag.GetObject() is not None]
+            if not self.tags[t]: # If every tag of the type is removed
+                del self.tags[t]
+
+class Names(object):
+    """ Lowercase names of the objects with trigram index for substring, glob and regex searches """
+    def __init__(self, doc):
+        hierarchy = GetHierarchy(doc) # Names are collected from the objects of the hierarchy index
+        self.objects = hierarchy.objects # Objects in Object Manager order
+        self.names = [obj.GetName().lower() for obj in self.objects] # Names are searched case insensitively
+        self.trigrams = {} # Indices of the objects by three letter parts of the name
+        for i, name in enumerate(self.names): # Iterate through names
+            for trigram in set(name[k:k+3] for k in range(len(name)-2)):
+                self.trigrams.setdefault(trigram, array.array('l')).append(i)
+        self.results = {} # Indices of earlier searches: {(kind, query): indices}
+
+    def Candidates(self, literals):
+        """ Returns indices of names that contain every trigram of the literal parts, None if parts are too short for the index """
+        trigrams = set(text[k:k+3] for text in literals for k in range(len(text)-2))
+        if not trigrams: # If there is nothing to look up
+            return None
+        postings = sorted((self.trigrams.get(trigram, []) for trigram in trigrams), key=len) # Shortest list first
+        found = set(postings[0])
+        for posting in postings[1:]: # Narrow down with the other trigrams
+            if not found:
+                break
+            found.intersection_update(posting)
+        return sorted(found)
+
+    def Search(self, query, kind="substring"):
+        """ Returns objects whose name matches the query in Object Manager order, kind is "substring", "glob" or "regex".
+        Current name of every hit is checked, an object renamed after the index was built is not returned by its old name """
+        if kind == "regex": # Regular expression, literal parts are not known
+            pattern = re.compile(query, re.IGNORECASE)
+            literals = []
+            match = lambda name: pattern.search(name) is not None
+        elif kind == "glob": # Wildcards (* ? [...]) and the whole name has to match
+            pattern = re.compile(fnmatch.translate(query.lower()))
+            literals = re.split(r"\*|\?|\[[^\]]*\]", query.lower()) # Parts between wildcards
+            match = lambda name: pattern.match(name) is not None
+        else: # Name contains the text
+            text = query.lower()
+            literals = [text]
+            match = lambda name: text in name
+        key = (kind, query)
+        if key not in self.results: # If query is not searched yet
+            candidates = self.Candidates(literals)
+            if candidates is None: # If index can't narrow down, every name is checked
+                candidates = range(len(self.names))
+            self.results[key] = [i for i in candidates if match(self.names[i])]
+        return [self.objects[i] for i in self.results[key] if match(self.objects[i].GetName().lower())]
+
+class Attributes(object):
+    """ Objects of the document bucketed by display color, visibility, layer and display color mode """
+    parameters = {"editor": c4d.ID_BASEOBJECT_VISIBILITY_EDITOR, # Parameters of the attributes that are read directly
+                  "render": c4d.ID_BASEOBJECT_VISIBILITY_RENDER,
+                  "colorMode": c4d.ID_BASEOBJECT_USECOLOR}
+
+    def __init__(self, doc):
+        hierarchy = GetHierarchy(doc) # Attributes are read from the objects of the hierarchy index
+        self.doc = doc # Layers are looked up from the document
+        self.objects = hierarchy.objects # Objects in Object Manager order
+        self.buckets = {"color": {}, # Indices of the objects by quantized display color (r, g, b)
+                        "editor": {}, # By visible in editor (0 on, 1 off, 2 default)
+                        "render": {}, # By visible in renderer (0 on, 1 off, 2 default)
+                        "layer": {}, # By GUID of the layer, None if object has no layer
+                        "colorMode": {}} # By display color mode (0 off, 1 automatic, 2 on, 3 layer)
+        for i, obj in enumerate(self.objects): # Iterate through every object
+            for attribute in self.buckets: # Iterate through attributes
+                self.buckets[attribute].setdefault(self.Value(obj, attribute), array.array('l')).append(i)
+
+    def Value(self, obj, attribute):
+        """ Returns current value of the attribute of the object, display color is quantized to its bucket """
+        if attribute == "color": # Display color
+            return Quantize(obj[c4d.ID_BASEOBJECT_COLOR])
+        if attribute == "layer": # Layer
+            layer = obj.GetLayerObject(self.doc)
+            return layer.GetGUID() if layer is not None else None
+        return obj[self.parameters[attribute]]
+
+    def Get(self, attribute, value):
+        """ Returns objects that have the value ("editor", "render", "layer" or "colorMode") in Object Manager order.
+        Current value of every object is checked, objects changed after the index was built are skipped """
+        return [self.objects[i] for i in self.buckets[attribute].get(value, []) if self.Value(self.objects[i], attribute) == value]
+
+    def SameColor(self, color, tolerance=0.0):
+        """ Returns objects whose display color channels differ at most tolerance from the color, in Object Manager order.
+        Current color of every candidate is compared """
+        low = Quantize(color - c4d.Vector(tolerance)) # Corner buckets of the tolerance box
+        high = Quantize(color + c4d.Vector(tolerance))
+        buckets = self.buckets["color"]
+        found = []
+        for r in range(low[0], high[0]+1): # Iterate through buckets inside the tolerance box
+            for g in range(low[1], high[1]+1):
+                for b in range(low[2], high[2]+1):
+                    for i in buckets.get((r, g, b), []): # Compare current colors of the bucket exactly
+                        other = self.objects[i][c4d.ID_BASEOBJECT_COLOR]
+                        if abs(other.x-color.x) <= tolerance and abs(other.y-color.y) <= tolerance and abs(other.z-color.z) <= tolerance:
+                            found.append(i)
+        found.sort() # Back to Object Manager order
+        return [self.objects[i] for i in found]
+
+class Links(object):
+    """ Reverse links of the document, who uses the object, by GUID of the linked object """
+    def __init__(self, doc):
+        types = GetTypes(doc) # Linking objects are found from the type index
+        self.generators = {} # MoGraph generators that use the effector: [(generator, name of the list)]
+        self.users = {} # Effectors and fields that have the object in their field list
+        self.instances = {} # Objects that use the object as their source
+        for op in types.Get(effectorLists): # Iterate through MoGraph generators
+            for effector, name in GetEffectors(op, doc):
+                self.generators.setdefault(effector.GetGUID(), []).append((op, name))
+        for op in types.Get(effectors | fields): # Iterate through objects that can have field list
+            for field in GetFields(op, doc):
+                self.users.setdefault(field.GetGUID(), []).append(op)
+        for op in types.Get(sourceLinks): # Iterate through objects that can have source object
+            source = GetSource(op)
+            if source is not None:
+                self.instances.setdefault(source.GetGUID(), []).append(op)
+
+    def Generators(self, obj):
+        """ Returns MoGraph generators that use the effector: [(generator, name of the list)] """
+        return self.generators.get(obj.GetGUID(), [])
+
+    def Effectors(self, obj):
+        """ Returns effectors that use the field, also through fields that have it as a sub-field """
+        found = [] # Effectors that use the field
+        visited = set([obj.GetGUID()]) # Objects that are already checked
+        stack = [obj] # Fields whose users are not checked yet
+        while stack:
+            for user in self.users.get(stack.pop().GetGUID(), []): # Iterate through objects that use the field
+                if user.GetGUID() in visited:
+                    continue
+                visited.add(user.GetGUID())
+                if user.GetType() in fields: # If sub-field, users of the parent field use it too
+                    stack.append(user)
+                else:
+                    found.append(user)
+        return found
+
+    def Instances(self, obj):
+        """ Returns objects that use the object as their source """
+        return self.instances.get(obj.GetGUID(), [])
+
+# Functions
+def GetEffectors(op, doc):
+    """ Returns effectors in the effector lists of the MoGraph generator: [(effector, name of the list)] """
+    found = []
+    for parameter, name in effectorLists.get(op.GetType(), []): # Iterate through effector lists
+        inExclude = op[parameter]
+        if inExclude is None:
+            continue
+        for i in range(inExclude.GetObjectCount()): # Iterate through effector list
+            effector = inExclude.ObjectFromIndex(doc, i)
+            if effector is not None: # If effector is not deleted
+                found.append((effector, name))
+    return found
+
+def GetFields(op, doc):
+    """ Returns objects in the field list of the object, layers inside folders included """
+    fieldList = op[c4d.FIELDS] # Get field list
+    if fieldList is None: # If object has no field list
+        return []
+    return GetFieldListObjects(fieldList, doc)
+
+def GetFieldListObjects(fieldList, doc):
+    """ Returns objects of the object layers in the field list, layers inside folders included """
+    found = []
+    layer = fieldList.GetLayersRoot().GetFirst() # Get first field layer
+    while layer: # Iterate through field layers
+        link = layer.GetLinkedObject(doc)
+        if link is not None: # If layer is an object layer
+            found.append(link)
+        if layer.GetDown(): # If folder layer
+            layer = layer.GetDown()
+            continue
+        while not layer.GetNext() and layer.GetUp():
+            layer = layer.GetUp()
+        layer = layer.GetNext()
+    return found
+
+def GetSource(op):
+    """ Returns source object of the Instance, Connect, MoInstance, Cloner, Matrix or MoSpline object, None if there is no source """
+    if op.GetType() not in sourceLinks: # If object has no source link
+        return None
+    parameter, mode, value = sourceLinks[op.GetType()]
+    if mode is not None and op[mode] != value: # If source link is not used in the current mode
+        return None
+    return op[parameter]
+
+def Walk(op, match=None, prune=None):
+    """ Iterates the object, its next siblings and their descendants in Object Manager order and yields (object, depth).
+    Objects are yielded only if match(object) is true, children are skipped if prune(object) is true """
+    depth = 0 # Depth relative to the first object
+    while op: # Iterate until there is no next object
+        if match is None or match(op): # If object is wanted
+            yield op, depth
+        if op.GetDown() and (prune is None or not prune(op)): # If object has children that are not skipped
+            op = op.GetDown()
+            depth += 1
+            continue
+        while not op.GetNext() and depth > 0: # Go up until there is next object
+            op = op.GetUp()
+            depth -= 1
+        op = op.GetNext()
+
+def Quantize(color):
+    """ Returns display color bucket of the color """
+    return (int(math.floor(color.x/colorStep)), int(math.floor(color.y/colorStep)), int(math.floor(color.z/colorStep)))
+
+def ChangeSelection(doc, select=(), deselect=()):
+    """ Selects and deselects objects, only objects whose selection actually changes get an undo entry. Deselect wins if object is in both. Call between StartUndo() and EndUndo() """
+    removed = set(obj.GetGUID() for obj in deselect) # Objects that will be deselected
+    changed = 0 # Amount of changed objects
+    for obj in select: # Iterate through objects to select
+        if not obj.GetBit(c4d.BIT_ACTIVE) and obj.GetGUID() not in removed: # If object is not selected yet
+            doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
+            obj.SetBit(c4d.BIT_ACTIVE) # Select object
+            changed += 1
+    for obj in deselect: # Iterate through objects to deselect
+        if obj.GetBit(c4d.BIT_ACTIVE): # If object is selected
+            doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
+            obj.DelBit(c4d.BIT_ACTIVE) # Deselect object
+            changed += 1
+    return changed
+
+def GetDirty(doc):
+    """ Returns cache key of the document: hierarchy dirty checksum, it changes when objects are added, removed, moved or edited,
+    and amount of top level objects as a guard that is read without walking the hierarchy """
+    return (doc.GetHDirty(c4d.HDIRTYFLAGS_OBJECT_HIERARCHY | c4d.HDIRTYFLAGS_OBJECT), len(doc.GetObjects()))
+
+def GetCached(doc, name, build, key=None):
+    """ Returns named index of the document from the cache, it is built again if the document has changed or if its own key has changed.
+    Indexes that are built inside another build use the same check, the document is checked once """
+    global building
+    entry = None # Cache entry of the document
+    for item in cache[:]: # Iterate through cached documents
+        if not item[0].IsAlive(): # If document is closed
+            cache.remove(item)
+        elif item[0] == doc:
+            entry = item
+    if entry is None: # If document is not cached
+        entry = [doc, GetDirty(doc), {}]
+        cache.insert(0, entry)
+        del cache[maxDocuments:]
+    elif not building: # Nested builds were already checked by the outer call
+        dirty = GetDirty(doc)
+        if entry[1] != dirty: # If document has changed, every index is out of date
+            entry[1] = dirty
+            entry[2] = {}
+    if name not in entry[2] or entry[2][name][0] != key: # If index is not built yet or is out of date
+        building += 1
+        try:
+            entry[2][name] = [key, build(doc)]
+        finally:
+            building -= 1
+    return entry[2][name][1]
+
+def Invalidate(doc):
+    """ Removes indexes of the document from the cache, scripts that change the hierarchy call this """
+    for item in cache[:]: # Iterate through cached documents
+        if not item[0].IsAlive() or item[0] == doc: # If closed or the given document
+            cache.remove(item)
+
+def GetHierarchy(doc):
+    """ Returns hierarchy index of the document """
+    return GetCached(doc, "hierarchy", Hierarchy)
+
+def GetTypes(doc):
+    """ Returns type index of the document """
+    return GetCached(doc, "types", Types)
+
+def GetTagDirty(doc):
+    """ Returns tag dirty checksum of the document, it changes when tags are added, removed or moved """
+    return doc.GetHDirty(c4d.HDIRTYFLAGS_TAG)
+
+def GetTags(doc):
+    """ Returns tag index of the document """
+    return GetCached(doc, "tags", Tags, GetTagDirty(doc))
+
+def TagsRemoved(doc):
+    """ Drops removed tags from the cached tag index, tag scripts call this after removing tags so the index is not built again.
+    Other indexes are checked as usual on the next call """
+    for item in cache: # Iterate through cached documents
+        if item[0] == doc and "tags" in item[2]: # If tag index of the document is cached
+            item[2]["tags"][1].Prune()
+            item[2]["tags"][0] = GetTagDirty(doc)
+
+def GetNames(doc):
+    """ Returns name index of the document, earlier search results are kept until the document changes """
+    return GetCached(doc, "names", Names)
+
+def GetAttributes(doc):
+    """ Returns attribute index of the document """
+    return GetCached(doc, "attributes", Attributes)
+
+def GetLinks(doc):
+    """ Returns reverse link index of the document """
+    return GetCached(doc, "links", Links)
+
+def main():
+    """ Prints statistics of the active document's index """
+    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
+    hierarchy = GetHierarchy(doc)
+    print("Objects: %d" % len(hierarchy.objects))
+    print("Deepest level: %d" % (max(hierarchy.depth) if hierarchy.objects else 0))
+    types = GetTypes(doc)
+    print("Generators: %d, MoGraph generators: %d, Effectors: %d, Fields: %d" % (types.Count(generators),
+        types.Count(moGenerators), types.Count(effectors), types.Count(fields)))
+
+# Execute main()
+if __name__=='__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+AR_SelectByName
+
+Author: Arttu Rautio (aturtur)
+Website: http://aturtur.com/
+Name-US: AR_SelectByName
+Version: 1.0
+Description-US: DEFAULT: Selects objects whose name contains the text, wildcards (* ? [ ]) match the whole name. SHIFT: Keeps original selection. CTRL: Search with regular expression.
+
+Written for Maxon Cinema 4D R21.207
+Python version 2.7.14
+"""
+# Libraries
+import c4d
+import os
+import sys
+import re
+from c4d import gui
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
+
+# Functions
+def GetKeyMod():
+    bc = c4d.BaseContainer() # Initialize a base container
+    keyMod = "None" # Initialize a keyboard modifier status
+    # Button is pressed
+    if c4d.gui.GetInputState(c4d.BFM_INPUT_KEYBOARD,c4d.BFM_INPUT_CHANNEL,bc):
+        if bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QSHIFT:
+            if bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QCTRL: # Ctrl + Shift
+                if bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QALT: # Alt + Ctrl + Shift
+                    keyMod = 'Alt+Ctrl+Shift'
+                else: # Shift + Ctrl
+                    keyMod = 'Ctrl+Shift'
+            elif bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QALT: # Alt + Shift
+                keyMod = 'Alt+Shift'
+            else: # Shift
+                keyMod = 'Shift'
+        elif bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QCTRL:
+            if bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QALT: # Alt + Ctrl
+                keyMod = 'Alt+Ctrl'
+            else: # Ctrl
+                keyMod = 'Ctrl'
+        elif bc[c4d.BFM_INPUT_QUALIFIER] & c4d.QALT: # Alt
+            keyMod = 'Alt'
+        else: # No keyboard modifiers used
+            keyMod = 'None'
+        return keyMod
+
+def GetKind(query, regex): # Get search type of the query
+    if regex: # If regular expression
+        return "regex"
+    for c in "*?[": # Iterate through wildcards
+        if c in query: # If query has wildcards
+            return "glob"
+    return "substring"
+
+def main():
+    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
+    keyMod = GetKeyMod() # Get keymodifier
+    regex = keyMod in ("Ctrl", "Ctrl+Shift") # Regular expression search (CTRL)
+    query = gui.InputDialog("Regular expression" if regex else "Name", "") # Ask search text
+    if not query: # If cancelled or empty
+        return
+    names = AR_SceneIndex.GetNames(doc) # Get name index, it is built only if the document has changed
+    try: # Try to search
+        found = names.Search(query, GetKind(query, regex))
+    except re.error: # If regular expression is not valid
+        gui.MessageDialog("Invalid regular expression: " + query)
+        return
+
+    deselect = [] # Objects that will be deselected
+    if keyMod not in ("Shift", "Ctrl+Shift"): # If original selection is not kept
+        matched = set(obj.GetGUID() for obj in found) # Found objects stay selected
+        for obj in doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_CHILDREN): # Loop through selection
+            if obj.GetGUID() not in matched:
+                deselect.append(obj)
+    doc.StartUndo() # Start recording undos
+    AR_SceneIndex.ChangeSelection(doc, found, deselect) # Change only objects whose selection changes
+    doc.EndUndo() # Stop recording undos
+    print("Found %d object(s)" % len(found))
+    c4d.EventAdd() # Refresh Cinema 4D
+
+# Execute main()
+if __name__=='__main__':
+    main()
@@ -20,7 +20,13 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
 from c4d import utils as u
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
 def GetKeyMod():
@@ -49,62 +55,28 @@ def GetKeyMod():
             keyMod = 'None'
         return keyMod
 
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
- 
-def Select(lst):
-    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
-    for l in lst: # Iterate through objects
-        doc.AddUndo(c4d.UNDOTYPE_BITS, l) # Record undo
-        l.SetBit(c4d.BIT_ACTIVE) # Select object
-
-def Deselect(lst):
-    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
-    for l in lst: # Iterate through objects
-        doc.AddUndo(c4d.UNDOTYPE_BITS, l) # Record undo
-        l.DelBit(c4d.BIT_ACTIVE) # Deselect object
-
-def CollectByVisibility(op, keyMod):
-    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
+def CollectByVisibility(attributes, keyMod):
     selectionList = []
     deselectionList = []
-    if op is None:
-        return
-    while op:
-        # Select
-        if keyMod == "None": # Default: Select visible in editor: On
-            if op[c4d.ID_BASEOBJECT_VISIBILITY_EDITOR] == 0: # On
-                selectionList.append(op) # Add object to the selection list
-        elif keyMod == "Shift": # Shift: Select visible in render: On
-            if op[c4d.ID_BASEOBJECT_VISIBILITY_RENDER] == 0: # On
-                selectionList.append(op) # Add object to the selection list
-        elif keyMod == "Alt": # Alt: Select visible in editor: Off
-            if op[c4d.ID_BASEOBJECT_VISIBILITY_EDITOR] == 1: # Off
-                selectionList.append(op) # Add object to the selection list
-        elif keyMod == "Alt+Shift": # Alt+Shift: Select visible in render: Off
-            if op[c4d.ID_BASEOBJECT_VISIBILITY_RENDER] == 1: # Off
-                selectionList.append(op) # Add object to the selection list
+    # Select
+    if keyMod == "None": # Default: Select visible in editor: On
+        selectionList = attributes.Get("editor", 0) # On
+    elif keyMod == "Shift": # Shift: Select visible in render: On
+        selectionList = attributes.Get("render", 0) # On
+    elif keyMod == "Alt": # Alt: Select visible in editor: Off
+        selectionList = attributes.Get("editor", 1) # Off
+    elif keyMod == "Alt+Shift": # Alt+Shift: Select visible in render: Off
+        selectionList = attributes.Get("render", 1) # Off
 
-        # Deselect
-        elif keyMod == "Ctrl": # Ctrl: Deselect visible in editor: On
-            if op[c4d.ID_BASEOBJECT_VISIBILITY_EDITOR] == 0: # On
-                deselectionList.append(op) # Add object to deselction list
-        elif keyMod == "Alt+Ctrl": # Alt+Ctrl: Deselect visible in editor: Off
-            if op[c4d.ID_BASEOBJECT_VISIBILITY_EDITOR] == 1: # Off
-                deselectionList.append(op) # Add object to deselction list
-        elif keyMod == "Ctrl+Shift": # Ctrl+Shift: Deselect visible in render: On
-            if op[c4d.ID_BASEOBJECT_VISIBILITY_RENDER] == 0: # On
-                deselectionList.append(op) # Add object to deselction list
-        elif keyMod == "Alt+Ctrl+Shift": # Alt+Ctrl+Shift: Deselect visible in render: Off
-            if op[c4d.ID_BASEOBJECT_VISIBILITY_RENDER] == 1: # Off
-                deselectionList.append(op) # Add object to deselction list
-        op = GetNextObject(op) # Get next object
+    # Deselect
+    elif keyMod == "Ctrl": # Ctrl: Deselect visible in editor: On
+        deselectionList = attributes.Get("editor", 0) # On
+    elif keyMod == "Alt+Ctrl": # Alt+Ctrl: Deselect visible in editor: Off
+        deselectionList = attributes.Get("editor", 1) # Off
+    elif keyMod == "Ctrl+Shift": # Ctrl+Shift: Deselect visible in render: On
+        deselectionList = attributes.Get("render", 0) # On
+    elif keyMod == "Alt+Ctrl+Shift": # Alt+Ctrl+Shift: Deselect visible in render: Off
+        deselectionList = attributes.Get("render", 1) # Off
 
     return selectionList, deselectionList
 
@@ -113,10 +85,9 @@ def main():
     keyMod = GetKeyMod() # Get keymodifier
     #try: # Try to execute following script
     #selection = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_CHILDREN) # Get active objects
-    start_object = doc.GetFirstObject() # Get first object
-    selectionList, deselectionList = CollectByVisibility(start_object, keyMod) # Do the thing
-    Select(selectionList) # Select objects
-    Deselect(deselectionList) # Deselect objects
+    attributes = AR_SceneIndex.GetAttributes(doc) # Objects by visibility, the index is built only if the document has changed
+    selectionList, deselectionList = CollectByVisibility(attributes, keyMod) # Do the thing
+    AR_SceneIndex.ChangeSelection(doc, selectionList, deselectionList) # Change only objects whose selection changes
     #except: # If something went wrong
         #pass # Do nothing
     doc.EndUndo() # Stop recording undos
@@ -12,11 +12,16 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
 from c4d import gui
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Global variables
-hierarchy = {} # Initialize hierarchy dictionary
-level = 0 # Initialize level variable (how deep object is in hierarchy)
+hierarchy = None # Hierarchy index of the document
 
 # Functions
 def GetKeyMod():
@@ -45,156 +50,49 @@ def GetKeyMod():
             keyMod = 'None'
         return keyMod
 
-def GetNextObject(op): # Get next object from Object Manager
-    global level # Access to global variable (level)
-    if op is None: # If there is no object
-        return None # Return none
-    if op.GetDown(): # If can go deeper in hierarchy
-        level += 1 # Going deeper in levels
-        return op.GetDown() # Return object
-    while not op.GetNext() and op.GetUp(): # If can't go to next object, but can go up
-        level -= 1 # Going up in levels
-        op = op.GetUp() # Object is parent object
-    return op.GetNext() # Return object
-
-def BuildHierarchyPath(obj): # Build hierarchy path for object
-    global level # Access to global variable (level)
-    path = [] # Initialize empty list for path
-    for i in range(0,level+1): # Iterate through levels
-        path.append(obj) # Add object to path list
-        if obj.GetUp() is not None: # If can go up in Object Manager
-            obj = obj.GetUp() # Going up
-    path.reverse() # Reverse path list 
-    return path # Return hierarchy path
-
-def BuildHierarchy(): # Build hierarchy dictionary
-    global level # Access to global variable (level)
-    global hieararchy # Access to global dictionary (hierarchy)
-    doc = c4d.documents.GetActiveDocument()
-    op = doc.GetFirstObject()
-    #hierarchy = {} # Initialize empty dictionary
-    i = 0 # Iteration variable
-    if op is None: # If there is no object
-        return # Return nothing
-    while op: # While there is object
-        hierarchy[i]={ # Add object information to hierarchy dictionary
-            'object': op, # Object
-            'level': level, # Object's level (how deep object is in Object Manager)
-            'name': op.GetName(), # Object's name
-            'root': FindRoot(op), # Object's root
-            'path': BuildHierarchyPath(op) # Object's full path in hierarchy
-        }
-        op = GetNextObject(op) # Get next object from Object Manager
-        i += 1 # Increase iteration variable
-    return hierarchy # Return hierarchy dictionary
-
-def FindRoot(data): # Find object's root
-    dataType = type(data).__name__ # Get incoming data type name
-    # List (data)
-    if dataType == "list": # If data is list do following
-        lst = data # Data is list
-        collection = [] # Initialize empty list for root object(s)
-        for obj in lst: # Loop through objects in 
-            while obj: # Infinite loop
-                if obj.GetUp() == None: # If can't go up in hierarchy
-                    collection.append(obj) # Add object to collection list
-                    break # Break the loop
-                obj = obj.GetUp() # Go up
-        return collection # Return collection of root object(s)
-    # Single object (data)
-    elif dataType == "BaseObject": # If data is single object do following
-        obj = data # Data is object
-        while obj: # Infinite loop
-            if obj.GetUp() == None: # If can't go up in Object Manager
-                return obj # Return object
-                break # Break the loop
-            obj = obj.GetUp() # Get up
-
 def FindChildren(start, targetLevel=0, addRest=False): # Find children of the object
-    global level # Access to global variable (level)
-    global hieararchy # Access to global dictionary (hierarchy)
-    collection = [] # Initialize empty list for children
-    for h in hierarchy: # Loop through hierarchy
-        if start == hierarchy[h]['object']: # Starting position in hierarchy
-            l = hierarchy[h]['level'] # Starting level
-    for counter, item in hierarchy.items(): # Loop through items in hierarchy dictionary
-        for p in item['path']: # Loop through objects' paths
-            if p == start: # Starting position in hierarchy
-                for c, i in enumerate(item['path']): # Loop through object's path
-                    if c > l: # If child of the selected object
-                        if targetLevel != 0: # If there is custom target level
-                            if addRest:
-                                print addRest, l+targetLevel
-                                if c >= l + targetLevel: # If level match
-                                    collection.append(i) # Add object to collection
-                            else:
-                                print addRest, l+targetLevel
-                                if c == l + targetLevel: # If level match
-                                    collection.append(i) # Add object to collection
-                        else: # If there is no target level (default)
-                            collection.append(i) # Add object to collection
-    return collection # Return collection of children
-
-def Select(data): # Select object(s)
-    dataType = type(data).__name__ # Get incoming data type name
-    # List (data)
-    if dataType == "list": # If data is list do following
-        lst = data # Data is list
-        for obj in lst: # Loop through list
-            doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
-            obj.SetBit(c4d.BIT_ACTIVE) # Select object in Object Manager
-    # Single object (data)
-    elif dataType == "BaseObject": # If data is single object do following
-        obj = data # Data is object
-        doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
-        obj.SetBit(c4d.BIT_ACTIVE) # Select object in Object Manager
-
-def Deselect(data): # Deselect object(s)
-    dataType = type(data).__name__ # Get incoming data type name
-    # List (data)
-    if dataType == "list": # If data is list do following
-        lst = data # Data is list
-        for obj in lst: # Data is list
-            doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
-            obj.DelBit(c4d.BIT_ACTIVE) # Deselect object in Object Manager
-    # Single object (data)
-    elif dataType == "BaseObject": # If data is single object do following
-        obj = data # Data is object
-        doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
-        obj.DelBit(c4d.BIT_ACTIVE) # Deselect object in Object Manager
+    i = hierarchy.Find(start) # Index of the object
+    if i is None: # If object is not in the hierarchy
+        return [] # Return empty list
+    if targetLevel != 0: # If there is custom target level
+        return hierarchy.DescendantsAt(i, targetLevel, addRest) # Children from the level, with deeper ones if addRest
+    return hierarchy.Descendants(i) # Every child (default)
 
 def main():
     doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
     doc.StartUndo() # Start recording undos
-    global hieararchy # Access to global dictionary (hierarchy)
-    hierarchy = BuildHierarchy()
+    global hierarchy # Access to global variable (hierarchy)
+    hierarchy = AR_SceneIndex.GetHierarchy(doc) # Get hierarchy index, it is built only if the document has changed
     selection = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_SELECTIONORDER)
     keyMod = GetKeyMod() # Get keymodifier
 
+    select = [] # Objects that will be selected
+    deselect = [] # Objects that will be deselected
     if keyMod == "None":
+        deselect = selection # Deselect selected objects
         for obj in selection: # Loop through selection
-            Deselect(obj) # Deselect selected object
-            Select(FindChildren(obj, 0, True)) # Select chldren object(s)
+            select.extend(FindChildren(obj, 0, True)) # Select chldren object(s)
     elif keyMod == "Shift":
         for obj in selection: # Loop through selection
-            Select(FindChildren(obj, 0, True))
+            select.extend(FindChildren(obj, 0, True))
     elif keyMod == "Ctrl":
         inp = int(gui.InputDialog('Child level', "2"))
+        deselect = selection
         for obj in selection: # Loop through selection
-            Deselect(obj) # Deselect selected object
-            Select(FindChildren(obj, inp, True))
+            select.extend(FindChildren(obj, inp, True))
     elif keyMod == "Ctrl+Shift":
         inp = int(gui.InputDialog('Child level', "2"))
         for obj in selection: # Loop through selection
-            Select(FindChildren(obj, inp, True))
+            select.extend(FindChildren(obj, inp, True))
     elif keyMod == "Alt":
         inp = int(gui.InputDialog('Child level', "2"))
         for obj in selection: # Loop through selection
-            Select(FindChildren(obj, inp, False))
+            select.extend(FindChildren(obj, inp, False))
     elif keyMod == "Alt+Shift":
         inp = int(gui.InputDialog('Child level', "2"))
         for obj in selection: # Loop through selection
-            Select(FindChildren(obj, inp, False))
+            select.extend(FindChildren(obj, inp, False))
+    AR_SceneIndex.ChangeSelection(doc, select, deselect) # Change only objects whose selection changes
 
     doc.EndUndo() # Stop recording undos
     c4d.EventAdd() # Refresh Cinema 4D
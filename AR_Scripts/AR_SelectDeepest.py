@@ -12,10 +12,15 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Global variables
-hierarchy = {} # Initialize hierarchy dictionary
-level = 0 # Initialize level variable (how deep object is in hierarchy)
+hierarchy = None # Hierarchy index of the document
 
 # Functions
 def GetKeyMod():
@@ -44,128 +49,29 @@ def GetKeyMod():
             keyMod = 'None'
         return keyMod
 
-def GetNextObject(op): # Get next object from Object Manager
-    global level # Access to global variable (level)
-    if op is None: # If there is no object
-        return None # Return none
-    if op.GetDown(): # If can go deeper in hierarchy
-        level += 1 # Going deeper in levels
-        return op.GetDown() # Return object
-    while not op.GetNext() and op.GetUp(): # If can't go to next object, but can go up
-        level -= 1 # Going up in levels
-        op = op.GetUp() # Object is parent object
-    return op.GetNext() # Return object
-
-def BuildHierarchyPath(obj): # Build hierarchy path for object
-    global level # Access to global variable (level)
-    path = [] # Initialize empty list for path
-    for i in range(0,level+1): # Iterate through levels
-        path.append(obj) # Add object to path list
-        if obj.GetUp() is not None: # If can go up in Object Manager
-            obj = obj.GetUp() # Going up
-    path.reverse() # Reverse path list 
-    return path # Return hierarchy path
-
-def BuildHierarchy(): # Build hierarchy dictionary
-    global level # Access to global variable (level)
-    global hieararchy # Access to global dictionary (hierarchy)
-    doc = c4d.documents.GetActiveDocument()
-    op = doc.GetFirstObject()
-    #hierarchy = {} # Initialize empty dictionary
-    i = 0 # Iteration variable
-    if op is None: # If there is no object
-        return # Return nothing
-    while op: # While there is object
-        hierarchy[i]={ # Add object information to hierarchy dictionary
-            'object': op, # Object
-            'level': level, # Object's level (how deep object is in Object Manager)
-            'name': op.GetName(), # Object's name
-            'root': FindRoot(op), # Object's root
-            'path': BuildHierarchyPath(op) # Object's full path in hierarchy
-        }
-        op = GetNextObject(op) # Get next object from Object Manager
-        i += 1 # Increase iteration variable
-    return hierarchy # Return hierarchy dictionary
-
-def FindRoot(data): # Find object's root
-    dataType = type(data).__name__ # Get incoming data type name
-    # List (data)
-    if dataType == "list": # If data is list do following
-        lst = data # Data is list
-        collection = [] # Initialize empty list for root object(s)
-        for obj in lst: # Loop through objects in 
-            while obj: # Infinite loop
-                if obj.GetUp() == None: # If can't go up in hierarchy
-                    collection.append(obj) # Add object to collection list
-                    break # Break the loop
-                obj = obj.GetUp() # Go up
-        return collection # Return collection of root object(s)
-    # Single object (data)
-    elif dataType == "BaseObject": # If data is single object do following
-        obj = data # Data is object
-        while obj: # Infinite loop
-            if obj.GetUp() == None: # If can't go up in Object Manager
-                return obj # Return object
-                break # Break the loop
-            obj = obj.GetUp() # Get up
-
 def FindDeepest(start): # Find deepest level item(s)
-    global hieararchy # Access to global dictionary (hierarchy)
-    collection = [] # Initialize empty list
-    sortedcollection = [] # Initialize empty list
-    for counter, item in hierarchy.items(): # Loop through hierarchy items
-        for p in item['path']: # Loop through paths
-            if p == start: # Starting point
-                collection.append([item['level'], item['path'][-1]])
-    maximum = max(collection)[0] # Maximum level of the collection
-    for item in collection: # Loop through collection
-        if item[0] == maximum: # If object is deepest
-            sortedcollection.append(item[1]) # Add object to list
-    return sortedcollection # Return list of deepest children
-
-def Select(data): # Select object(s)
-    dataType = type(data).__name__ # Get incoming data type name
-    # List (data)
-    if dataType == "list": # If data is list do following
-        lst = data # Data is list
-        for obj in lst: # Loop through list
-            doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
-            obj.SetBit(c4d.BIT_ACTIVE) # Select object in Object Manager
-    # Single object (data)
-    elif dataType == "BaseObject": # If data is single object do following
-        obj = data # Data is object
-        doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
-        obj.SetBit(c4d.BIT_ACTIVE) # Select object in Object Manager
-
-def Deselect(data): # Deselect object(s)
-    dataType = type(data).__name__ # Get incoming data type name
-    # List (data)
-    if dataType == "list": # If data is list do following
-        lst = data # Data is list
-        for obj in lst: # Loop through list
-            doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
-            obj.DelBit(c4d.BIT_ACTIVE) # Deselect object in Object Manager
-    # Single object (data)
-    elif dataType == "BaseObject": # If data is single object do following
-        obj = data # Data is object
-        doc.AddUndo(c4d.UNDOTYPE_BITS, obj) # Add undo command for changing bits
-        obj.DelBit(c4d.BIT_ACTIVE) # Deselect object in Object Manager
+    i = hierarchy.Find(start) # Index of the object
+    if i is None: # If object is not in the hierarchy
+        return [] # Return empty list
+    return hierarchy.Deepest(i) # Return list of deepest children
 
 def main():
     doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
     doc.StartUndo() # Start recording undos
-    global hieararchy # Access to global dictionary (hierarchy)
-    hierarchy = BuildHierarchy()
+    global hierarchy # Access to global variable (hierarchy)
+    hierarchy = AR_SceneIndex.GetHierarchy(doc) # Get hierarchy index, it is built only if the document has changed
     keyMod = GetKeyMod() # Get keymodifier
     selection = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_SELECTIONORDER)   
 
+    select = [] # Objects that will be selected
+    for obj in selection: # Loop through selection
+        select.extend(FindDeepest(obj)) # Select deepest chldren object(s)
+    deselect = [] # Objects that will be deselected
     if keyMod == "None":
-        for obj in selection: # Loop through selection
-            Deselect(obj) # Deselect selected object
-            Select(FindDeepest(obj)) # Select deepest chldren object(s)
-    elif keyMod == "Shift":
-        for obj in selection: # Loop through selection
-            Select(FindDeepest(obj)) # Select deepest chldren object(s)
+        kept = set(hierarchy.Find(obj) for obj in select) # Objects without children are their own deepest object and stay selected
+        deselect = [obj for obj in selection if hierarchy.Find(obj) not in kept] # Deselect selected objects
+    if keyMod in ["None", "Shift"]:
+        AR_SceneIndex.ChangeSelection(doc, select, deselect) # Change only objects whose selection changes
 
     doc.EndUndo() # Stop recording undos
     c4d.EventAdd() # Refresh Cinema 4D
@@ -12,6 +12,12 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
 def GetKeyMod():
@@ -50,25 +56,23 @@ def main():
     if (keyMod == "Ctrl") or (keyMod == "Alt"):
         nth = int(c4d.gui.InputDialog("Nth", 3))
     
+    select = [] # Objects that will be selected
+    deselect = [] # Objects that will be deselected
     if len(selection) != 0:
         for i, s in enumerate(selection):
             
             if keyMod == "None":
                 if i % 2 == 1: # Odd
-                    doc.AddUndo(c4d.UNDOTYPE_BITS, s)
-                    s.DelBit(c4d.BIT_ACTIVE)
+                    deselect.append(s)
             if keyMod == "Shift":
                 if i % 2 == 0: # Even
-                    doc.AddUndo(c4d.UNDOTYPE_BITS, s)
-                    s.DelBit(c4d.BIT_ACTIVE)
+                    deselect.append(s)
             if keyMod == "Ctrl":
                 if i % nth != 0: # Nth
-                    doc.AddUndo(c4d.UNDOTYPE_BITS, s)
-                    s.DelBit(c4d.BIT_ACTIVE)
+                    deselect.append(s)
             if keyMod == "Alt":
                 if i % nth == 0: # Nth
-                    doc.AddUndo(c4d.UNDOTYPE_BITS, s)
-                    s.DelBit(c4d.BIT_ACTIVE)
+                    deselect.append(s)
     else:
         first = doc.GetFirstObject()
         current = first
@@ -76,22 +80,19 @@ def main():
         while current != None:
             if keyMod == "None":
                 if i % 2 == 0: # Odd
-                    doc.AddUndo(c4d.UNDOTYPE_BITS, current)
-                    current.SetBit(c4d.BIT_ACTIVE)
+                    select.append(current)
             if keyMod == "Shift":
                 if i % 2 == 1: # Even
-                    doc.AddUndo(c4d.UNDOTYPE_BITS, current)
-                    current.SetBit(c4d.BIT_ACTIVE)
+                    select.append(current)
             if keyMod == "Ctrl":
                 if i % nth == 0: # Nth
-                    doc.AddUndo(c4d.UNDOTYPE_BITS, current)
-                    current.SetBit(c4d.BIT_ACTIVE)
+                    select.append(current)
             if keyMod == "Alt":
                 if i % nth != 0: # Nth
-                    doc.AddUndo(c4d.UNDOTYPE_BITS, current)
-                    current.SetBit(c4d.BIT_ACTIVE)
+                    select.append(current)
             current = current.GetNext()
             i = i+1
+    AR_SceneIndex.ChangeSelection(doc, select, deselect) # Change only objects whose selection changes
             
     
     doc.EndUndo() # Stop recording undos
@@ -5,43 +5,33 @@ Author: Arttu Rautio (aturtur)
 Website: http://aturtur.com/
 Name-US: AR_SelectSameColor
 Version: 1.0
-Description-US: Selects object(s) with same object color that active object has
+Description-US: Selects object(s) with same object color that active object has, within the color tolerance (colorTolerance)
 
 Written for Maxon Cinema 4D R21.207
 Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
-# Functions
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
- 
-def IterateHierarchy(op, color):
-    doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
-    if op is None:
-        return
-    while op:
-        if op[c4d.ID_BASEOBJECT_COLOR] == color: # If object color is same as reference color
-            op.SetBit(c4d.BIT_ACTIVE) # Select object
-            doc.AddUndo(c4d.UNDOTYPE_CHANGE, op) # Add undo command for selecting object
-        op = GetNextObject(op) # Get next object
-    return True
+# Global variables
+colorTolerance = 0.004 # Largest difference of a color channel (0-1) that is still the same color
 
+# Functions
 def main():
     doc = c4d.documents.GetActiveDocument() # Get active Cinema 4D document
     doc.StartUndo() # Start recording undos
     try: # Try to execute following script
         active_object = doc.GetActiveObject() # Get active object
         reference_color = active_object[c4d.ID_BASEOBJECT_COLOR] # Object color
-        start_object = doc.GetFirstObject() # Get first object
-        IterateHierarchy(start_object, reference_color) # Do the thing
+        attributes = AR_SceneIndex.GetAttributes(doc) # Objects by color, the index is built only if the document has changed
+        selectionList = attributes.SameColor(reference_color, colorTolerance) # Do the thing
+        AR_SceneIndex.ChangeSelection(doc, selectionList) # Select only objects that are not selected yet
     except: # If something went wrong
         pass # Do nothing
     doc.EndUndo() # Stop recording undos
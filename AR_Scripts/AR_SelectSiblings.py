@@ -12,6 +12,12 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
 def GetKeyMod():
@@ -40,18 +46,6 @@ def GetKeyMod():
             keyMod = 'None'
         return keyMod
 
-def Select(lst):
-    if len(lst) > 0: # If list is not empty
-        for l in lst:
-            doc.AddUndo(c4d.UNDOTYPE_BITS, l) # Record undo for changing bits
-            l.SetBit(c4d.BIT_ACTIVE) # Select object
-
-def Deselect(lst):
-    if len(lst) > 0: # If list is not empty
-        for l in lst:
-            doc.AddUndo(c4d.UNDOTYPE_BITS, l) # Record undo for changing bits
-            l.DelBit(c4d.BIT_ACTIVE) # Deselect object
-
 def GetSiblings(op):
     pred = op # Store old object
     op = op.GetUp() # Get parent object
@@ -68,15 +62,16 @@ def main():
     selection = doc.GetActiveObjects(c4d.GETACTIVEOBJECTFLAGS_CHILDREN) # Get active objects
     keyMod = GetKeyMod() # Get keymodifier
 
+    select = [] # Objects that will be selected
+    deselect = [] # Objects that will be deselected
     if keyMod == "None":
         for s in selection: # Loop through selection
-            Select(GetSiblings(s)) # Select parent object
+            select.extend(GetSiblings(s)) # Select siblings
     elif keyMod == "Ctrl":
         for s in selection:
-            Select(GetSiblings(s))
-        for s in selection:
-            Deselect([s]) # Deselect original object
-
+            select.extend(GetSiblings(s))
+        deselect = selection # Deselect original objects
+    AR_SceneIndex.ChangeSelection(doc, select, deselect) # Change only objects whose selection changes
 
     doc.EndUndo() # Stop recording undos
     c4d.EventAdd() # Refresh Cinema 4D
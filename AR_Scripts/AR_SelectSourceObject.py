@@ -5,13 +5,19 @@ Author: Arttu Rautio (aturtur)
 Website: http://aturtur.com/
 Name-US: AR_SelectSourceObject
 Version: 1.0
-Description-US: Selects the source object. Supports Instance, Connect, MoInstance, MoSpline, Cloner and Matrix objects
+Description-US: Selects the source object. Supports Instance, Connect, MoInstance, MoSpline, Cloner and Matrix objects. SHIFT: Keep also original selection. CTRL: Select objects that use selected object as source
 
 Written for Maxon Cinema 4D R21.207
 Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Functions
 def GetKeyMod():
@@ -56,28 +62,19 @@ def main():
     keyMod = GetKeyMod() # Get keymodifier
     doc.StartUndo() # Start recording undos
     selection = doc.GetSelection() # Get active selection
+    if keyMod in ("Ctrl", "Ctrl+Shift"): # If selecting objects that use the selection as source
+        links = AR_SceneIndex.GetLinks(doc) # Get reverse links of the document
     for x in selection: # Loop through selection
         try: # Try to execute following script
-            if x.GetType() == 5126: # Instance Object
-                source = x[c4d.INSTANCEOBJECT_LINK]
-                Select(x, source, doc, keyMod)
-            if x.GetType() == 1011010: # Connect Object
-                source = x[c4d.CONNECTOBJECT_LINK]
-                Select(x, source, doc, keyMod)
-            if x.GetType() == 1018957: # MoInstance Object
-                source = x[c4d.MGINSTANCER_LINK]
-                Select(x, source, doc, keyMod)
-            if x.GetType() == 1018544: # Cloner Object
-                if x[c4d.ID_MG_MOTIONGENERATOR_MODE] == 0: # Object Mode
-                    source = x[c4d.MG_OBJECT_LINK]
-                    Select(x, source, doc, keyMod)
-            if x.GetType() == 1018545: # Matrix Object
-                if x[c4d.ID_MG_MOTIONGENERATOR_MODE] == 0: # Object Mode
-                    source = x[c4d.MG_OBJECT_LINK]
-                    Select(x, source, doc, keyMod)
-            if x.GetType() == 440000054: #MoSpline Object
-                if x[c4d.MGMOSPLINEOBJECT_MODE] == 1: #Spline
-                    source = x[c4d.MGMOSPLINEOBJECT_SOURCE_SPLINE]
+            if keyMod == "Ctrl": # Select objects that use the object as source
+                for instance in links.Instances(x):
+                    Select(x, instance, doc, "None")
+            elif keyMod == "Ctrl+Shift": # Keep also original selection
+                for instance in links.Instances(x):
+                    Select(x, instance, doc, "Shift")
+            else:
+                source = AR_SceneIndex.GetSource(x) # Get source object
+                if source is not None:
                     Select(x, source, doc, keyMod)
         except: # If something went wrong
             pass # Do nothing
@@ -12,7 +12,13 @@ Python version 2.7.14
 """
 # Libraries
 import c4d
+import os
+import sys
 from c4d import utils
+path = os.path.dirname(__file__) # Folder of the script
+if path not in sys.path: # Shared modules are next to the scripts
+    sys.path.append(path)
+import AR_SceneIndex
 
 # Global variables
 global toClean
@@ -66,25 +72,21 @@ def MakeEditable(op, tempDoc):
         op = c4d.utils.SendModelingCommand(makeEditable, [clone], 0, bc, doc) # Make editable
         if op: return op[0] # Return object
 
-def GetNextObject(op):
-    if op==None:
-        return None
-    if op.GetDown():
-        return op.GetDown()
-    while not op.GetNext() and op.GetUp():
-        op = op.GetUp()
-    return op.GetNext()
+def IsGeometry(op):
+    return op.GetType() != 5103 # Cameras are not collision geometry
+
+def UsesChildren(op):
+    return bool(op.GetInfo() & c4d.OBJECT_INPUT) and op[c4d.ID_BASEOBJECT_GENERATOR_FLAG] is not False # Children of enabled generators are already in the editable generator
 
 def IterateHierarchy(op):
     objects = []
     tempDoc = c4d.documents.BaseDocument()
     if op is None: return
-    while op:
+    for op, depth in AR_SceneIndex.Walk(op, IsGeometry, UsesChildren): # Iterate through every object except cameras and generator inputs
         if isinstance(op, c4d.PolygonObject):
             objects.append(op.GetClone())
-        elif (isinstance(op, c4d.BaseObject)) and (op.GetType() != 5103):
+        elif isinstance(op, c4d.BaseObject):
             objects.append(MakeEditable(op, tempDoc))
-        op = GetNextObject(op) # Get next object
     if len(objects) != 0:
         null = c4d.BaseObject(c4d.Onull)
         tempDoc.InsertObject(null)
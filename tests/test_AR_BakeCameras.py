@@ -0,0 +1,53 @@
+"""
+Tests for AR_BakeCameras
+
+Cinema 4D modules are needed, run with c4dpy of Cinema 4D R21:
+c4dpy -m unittest discover -s tests
+"""
+# Libraries
+import math
+import os
+import sys
+import unittest
+try:
+    import c4d
+except ImportError: # Outside Cinema 4D
+    raise unittest.SkipTest("c4d module is not available, run with c4dpy")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AR_Scripts")) # Scripts are imported as modules
+import AR_BakeCameras
+
+# Classes
+class NukeRotationTest(unittest.TestCase):
+    """ Cinema 4D HPB rotation is Y (H), X (P) and Z (B) in left-handed space. Nuke ZXY rotation applies Z, X and Y in right-handed space,
+    so the same camera is rotate (P, H, -B) in Nuke: heading turns the same way, pitch up is positive and bank is mirrored """
+    def assertRotation(self, h, p, b, expected):
+        mg = c4d.utils.HPBToMatrix(c4d.Vector(math.radians(h), math.radians(p), math.radians(b)), c4d.ROTATIONORDER_HPB)
+        for value, wanted in zip(AR_BakeCameras.GetNukeRotation(mg, None), expected):
+            self.assertAlmostEqual(value, wanted, places=6)
+
+    def testIdentity(self):
+        self.assertRotation(0, 0, 0, (0, 0, 0))
+
+    def testSingleAxes(self):
+        self.assertRotation(90, 0, 0, (0, 90, 0)) # Camera looks to -X in both
+        self.assertRotation(0, 30, 0, (30, 0, 0)) # Camera looks up in both
+        self.assertRotation(0, 0, 30, (0, 0, -30)) # Bank is mirrored
+
+    def testCombined(self):
+        self.assertRotation(30, 20, 10, (20, 30, -10))
+        self.assertRotation(-120, -45, 75, (-45, -120, -75))
+
+    def testScaledMatrix(self):
+        mg = c4d.utils.HPBToMatrix(c4d.Vector(math.radians(30), math.radians(20), math.radians(10)), c4d.ROTATIONORDER_HPB)
+        mg.v1 *= 2.0 # Scale does not change the rotation
+        mg.v3 *= 0.5
+        for value, wanted in zip(AR_BakeCameras.GetNukeRotation(mg, None), (20, 30, -10)):
+            self.assertAlmostEqual(value, wanted, places=6)
+
+    def testContinuity(self):
+        mg = c4d.utils.HPBToMatrix(c4d.Vector(math.radians(-170), 0, 0), c4d.ROTATIONORDER_HPB)
+        self.assertAlmostEqual(AR_BakeCameras.GetNukeRotation(mg, (0, 175, 0))[1], 190, places=6) # Continues past 180 instead of flipping
+
+# Execute tests
+if __name__=='__main__':
+    unittest.main()